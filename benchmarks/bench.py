@@ -0,0 +1,206 @@
+"""
+Micro benchmarks for the grid, text, table and image hot paths.
+
+    python benchmarks/bench.py run -o results.json
+    python benchmarks/bench.py compare baseline.json results.json
+
+Each benchmark is run with several workload sizes, results are the seconds per call.
+compare exits with 1 if a benchmark got slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Callable
+
+import drawBot as db
+from PIL import Image
+
+from drawBotGrid import BaselineGrid, ColumnGrid, Grid, Table, imageBox
+from drawBotGrid.aliases import ColumnDescription
+from drawBotGrid.image import image_cache
+from drawBotGrid.text import baseline_grid_textBox, fit_text_to_box, measurement_cache
+
+PAGE_BOX = (50, 50, 900, 900)
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore "
+    "magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo. "
+)
+
+
+def bench_grid(subdivisions: int) -> Callable[[], None]:
+    def run() -> None:
+        grid = Grid(PAGE_BOX, subdivisions, subdivisions)
+        grid.cell_positions()
+        columns = ColumnGrid(PAGE_BOX, subdivisions)
+        for index in range(subdivisions):
+            _ = columns[index]
+            _ = columns * (index + 1)
+
+    return run
+
+
+def bench_baseline_lookups(lines: int) -> Callable[[], None]:
+    grid = BaselineGrid((0, 0, 1000, lines * 10), 10)
+    randomizer = random.Random(lines)
+    coordinates = [randomizer.uniform(-50, lines * 10 + 50) for _ in range(1000)]
+
+    def run() -> None:
+        grid.closest_lines_below_coordinates(coordinates)
+        grid.closest_lines_above_coordinates(coordinates)
+        for y in coordinates[:100]:
+            grid.closest_line_below_coordinate(y)
+
+    return run
+
+
+def bench_text(words: int) -> Callable[[], None]:
+    txt = " ".join((LOREM * (words // 10 + 1)).split()[:words])
+    baseline_grid = BaselineGrid(PAGE_BOX, 12)
+
+    def run() -> None:
+        measurement_cache.clear()
+        fit_text_to_box(txt, (50, 50, 400, 600), max_font_size=72)
+        baseline_grid_textBox(txt, (500, 50, 400, 600), baseline_grid)
+
+    return run
+
+
+def bench_table(size: tuple[int, int]) -> Callable[[], None]:
+    rows, columns = size
+    column_descriptions: list[ColumnDescription] = [{"title": f"column {index}"} for index in range(columns)]
+    items = [
+        {f"column {column}": f"{row * column % 97} EUR" if column % 2 else f"item {row}" for column in range(columns)}
+        for row in range(rows)
+    ]
+
+    def run() -> None:
+        measurement_cache.clear()
+        table = Table(PAGE_BOX, items, column_descriptions)
+        assert table.cell_rects
+
+    return run
+
+
+def bench_image_box(megapixels: int, directory: pathlib.Path) -> Callable[[], None]:
+    path = directory / f"image-{megapixels}mp.jpg"
+    side = int((megapixels * 1_000_000) ** 0.5)
+    Image.effect_noise((side, int(side * 0.75)), 64).convert("RGB").save(path)
+
+    def run() -> None:
+        image_cache.clear()
+        imageBox(path, (0, 0, 300, 300), fitting="fill", anchor=("center", "center"))
+
+    return run
+
+
+def bench_import(statement: str) -> Callable[[], None]:
+    """
+    import time in a fresh interpreter, import[drawBot] is the floor the others are compared to
+    """
+
+    def run() -> None:
+        subprocess.run([sys.executable, "-c", statement], check=True)
+
+    return run
+
+
+def collect_benchmarks(directory: pathlib.Path) -> dict[str, Callable[[], Callable[[], None]]]:
+    benchmarks = {}
+    for subdivisions in (8, 64, 512):
+        benchmarks[f"grid[{subdivisions}]"] = lambda subdivisions=subdivisions: bench_grid(subdivisions)
+    for lines in (100, 1000, 10000):
+        benchmarks[f"baseline_lookups[{lines}]"] = lambda lines=lines: bench_baseline_lookups(lines)
+    for words in (50, 500):
+        benchmarks[f"text[{words}]"] = lambda words=words: bench_text(words)
+    for size in ((100, 4), (1000, 8)):
+        benchmarks[f"table[{size[0]}x{size[1]}]"] = lambda size=size: bench_table(size)
+    for megapixels in (1, 4, 16):
+        benchmarks[f"image_box[{megapixels}mp]"] = lambda megapixels=megapixels: bench_image_box(megapixels, directory)
+    benchmarks["import[drawBot]"] = lambda: bench_import("import drawBot")
+    benchmarks["import[ColumnGrid]"] = lambda: bench_import("from drawBotGrid import ColumnGrid")
+    benchmarks["import[*]"] = lambda: bench_import("from drawBotGrid import *")
+    return benchmarks
+
+
+def time_benchmark(run: Callable[[], None], repeat: int) -> dict[str, float]:
+    timer = timeit.Timer(run)
+    # enough calls to last about 0.2 seconds
+    number, _ = timer.autorange()
+    timings = [timing / number for timing in timer.repeat(repeat=repeat, number=number)]
+    return {"min": min(timings), "median": statistics.median(timings), "number": number, "repeat": repeat}
+
+
+def run_benchmarks(selection: str | None = None, repeat: int = 5) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, setup in collect_benchmarks(pathlib.Path(directory)).items():
+            if selection and selection not in name:
+                continue
+            with db.drawing():
+                db.newPage(1000, 1000)
+                results[name] = time_benchmark(setup(), repeat)
+            print(f"{name:<28} {results[name]['median'] * 1000:>10.3f} ms")
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list[str]:
+    """
+    returns the names of the benchmarks whose median got slower than the baseline by more than threshold
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            print(f"{name:<28} {'new':>10}")
+            continue
+        ratio = result["median"] / baseline["results"][name]["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {ratio:>9.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="drawBotGrid micro benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-o", "--output", type=pathlib.Path, help="where to save the JSON results")
+    run_parser.add_argument("-k", "--select", help="only run the benchmarks whose name contains this")
+    run_parser.add_argument("--repeat", type=int, default=5)
+
+    compare_parser = commands.add_parser("compare", help="compare results to a baseline")
+    compare_parser.add_argument("baseline", type=pathlib.Path)
+    compare_parser.add_argument("current", type=pathlib.Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="tolerated slowdown, 0.1 is 10%%")
+
+    arguments = parser.parse_args()
+    if arguments.command == "run":
+        results = run_benchmarks(arguments.select, arguments.repeat)
+        if arguments.output:
+            arguments.output.write_text(json.dumps(results, indent=2))
+            print(f"Saved {arguments.output}")
+    else:
+        baseline = json.loads(arguments.baseline.read_text())
+        current = json.loads(arguments.current.read_text())
+        regressions = compare_results(baseline, current, arguments.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
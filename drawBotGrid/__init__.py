@@ -3,17 +3,84 @@ DrawBotGrid - A grid system for DrawBot
 
 """
 
-from drawBotGrid.grid import BaselineGrid, ColumnGrid, Grid, RowGrid
-from drawBotGrid.image import image_at_size, image_box, imageAtSize, imageBox
-from drawBotGrid.table import Table
-from drawBotGrid.text import (
-    baselineGridTextBox,
-    baselineHeight,
-    columnBaselineGridTextBox,
-    columnTextBox,
-    textOverflowTestMode,
-    verticalAlignTextBox,
-)
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from drawBotGrid.document import renderDocument
+    from drawBotGrid.grid import BaselineGrid, ColumnGrid, Grid, RowGrid
+    from drawBotGrid.image import (
+        ImageBoxesPrefetch,
+        image_at_size,
+        image_box,
+        imageAtSize,
+        imageBox,
+        imageBoxes,
+        imageBoxLayout,
+        imageBoxLayouts,
+        imageTargetDPI,
+    )
+    from drawBotGrid.instrumentation import stats, trace
+    from drawBotGrid.table import Table, paginateTable
+    from drawBotGrid.text import (
+        baselineGridTextBox,
+        baselineHeight,
+        clearMetricsCache,
+        columnBaselineGridTextBox,
+        columnTextBox,
+        fitColumnText,
+        fitTextToBox,
+        textOverflowTestMode,
+        verticalAlignTextBox,
+    )
+
+# public names are imported from their submodule on first access,
+# so `from drawBotGrid import ColumnGrid` doesn't load PIL, the tables or the text helpers
+_submodules_names = {
+    "drawBotGrid.document": ["renderDocument"],
+    "drawBotGrid.grid": ["BaselineGrid", "ColumnGrid", "Grid", "RowGrid"],
+    "drawBotGrid.image": [
+        "ImageBoxesPrefetch",
+        "image_at_size",
+        "image_box",
+        "imageAtSize",
+        "imageBox",
+        "imageBoxes",
+        "imageBoxLayout",
+        "imageBoxLayouts",
+        "imageTargetDPI",
+    ],
+    "drawBotGrid.instrumentation": ["stats", "trace"],
+    "drawBotGrid.table": ["Table", "paginateTable"],
+    "drawBotGrid.text": [
+        "baselineGridTextBox",
+        "baselineHeight",
+        "clearMetricsCache",
+        "columnBaselineGridTextBox",
+        "columnTextBox",
+        "fitColumnText",
+        "fitTextToBox",
+        "textOverflowTestMode",
+        "verticalAlignTextBox",
+    ],
+}
+_names_submodule = {name: submodule for submodule, names in _submodules_names.items() for name in names}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        submodule = _names_submodule[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(submodule), name)
+    # the next accesses don't go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
+
 
 __all__ = [
     "Grid",
@@ -22,13 +89,25 @@ __all__ = [
     "BaselineGrid",
     "baselineGridTextBox",
     "baselineHeight",
+    "clearMetricsCache",
     "columnBaselineGridTextBox",
     "columnTextBox",
+    "fitColumnText",
+    "fitTextToBox",
     "textOverflowTestMode",
     "verticalAlignTextBox",
     "Table",
+    "paginateTable",
+    "renderDocument",
+    "stats",
+    "trace",
     "imageAtSize",
     "imageBox",
+    "imageBoxes",
+    "imageBoxLayout",
+    "imageBoxLayouts",
+    "ImageBoxesPrefetch",
+    "imageTargetDPI",
     "image_at_size",
     "image_box",
 ]
@@ -1,5 +1,5 @@
 # aliases.py
-from typing import Literal, TypeAlias
+from typing import Callable, Literal, TypeAlias
 
 # Basic geometric types
 Box: TypeAlias = tuple[float, float, float, float]
@@ -20,3 +20,6 @@ TableItem: TypeAlias = dict[str, str]
 TableData: TypeAlias = list[TableItem]
 TableRow: TypeAlias = list[str]
 TableRows: TypeAlias = list[TableRow]
+
+# Document types
+PageBuilder: TypeAlias = Callable[[], None]
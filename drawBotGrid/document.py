@@ -0,0 +1,98 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Sequence
+
+import drawBot as db
+from drawBot.aliases import SomePath
+
+from .aliases import PageBuilder
+from .instrumentation import TraceEvent, current_tracer, span, trace
+
+
+def render_document(pages: Sequence[PageBuilder], path: SomePath, max_workers: int | None = None) -> None:
+    """
+    Draws a multi-page PDF, using several processes.
+
+    Each item of pages is a callable drawing one page, starting with its own newPage().
+    The pages are split in contiguous ranges, each range is drawn in a separate process
+    with its own drawing context, then the resulting PDFs are merged in order into path.
+
+    Page builders are sent to the worker processes, so they need to be picklable:
+    module level functions, or functools.partial of module level functions.
+    With max_workers=1, the pages are drawn in the current process.
+
+    Within a trace(), the worker processes trace their pages too, their events are merged into the trace.
+    """
+    if not pages:
+        raise ValueError("`pages` should contain at least one page builder")
+
+    path = Path(path)
+    workers = min(max_workers or os.cpu_count() or 1, len(pages))
+    if workers == 1:
+        _render_pages(pages, path)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        chunks = _split_pages(pages, workers)
+        chunk_paths = [Path(temp_dir) / f"pages_{i:04}.pdf" for i in range(len(chunks))]
+        tracer = current_tracer()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # consuming the results re-raises any exception from the workers
+            chunks_events = list(executor.map(_render_pages, chunks, chunk_paths, repeat(tracer is not None)))
+        if tracer is not None:
+            for events in chunks_events:
+                tracer.events.extend(events)
+        with span("render_document.merge", chunks=len(chunks)):
+            _merge_pdfs(chunk_paths, path)
+
+
+renderDocument = render_document
+
+
+def _split_pages(pages: Sequence[PageBuilder], chunks_count: int) -> list[Sequence[PageBuilder]]:
+    chunk_size, remainder = divmod(len(pages), chunks_count)
+    chunks = []
+    start = 0
+    for i in range(chunks_count):
+        end = start + chunk_size + (1 if i < remainder else 0)
+        chunks.append(pages[start:end])
+        start = end
+    return chunks
+
+
+def _render_pages(pages: Sequence[PageBuilder], path: Path, traced: bool = False) -> list[TraceEvent]:
+    """
+    draws the pages into path, returns the trace events of the pages if traced is True
+    """
+    if not traced:
+        _draw_pages(pages, path)
+        return []
+    with trace() as tracer:
+        _draw_pages(pages, path)
+    return tracer.events
+
+
+def _draw_pages(pages: Sequence[PageBuilder], path: Path) -> None:
+    with db.drawing():
+        for build_page in pages:
+            with span("render_document.page"):
+                build_page()
+        with span("render_document.save"):
+            db.saveImage(path)
+
+
+def _merge_pdfs(paths: Sequence[Path], out_path: Path) -> None:
+    # PDFKit comes with pyobjc, which DrawBot depends on
+    import AppKit
+    import Quartz
+
+    merged = Quartz.PDFDocument.alloc().init()
+    for path in paths:
+        document = Quartz.PDFDocument.alloc().initWithURL_(AppKit.NSURL.fileURLWithPath_(str(path)))
+        for page_index in range(document.pageCount()):
+            merged.insertPage_atIndex_(document.pageAtIndex_(page_index), merged.pageCount())
+    if not merged.writeToFile_(str(out_path)):
+        raise OSError(f"Could not write {out_path}")
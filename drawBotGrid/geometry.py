@@ -0,0 +1,526 @@
+"""
+The geometry of the grids, without DrawBot: importing this module doesn't import drawBot,
+so layouts can be planned in processes that never draw. The grids in drawBotGrid.grid add the drawing.
+"""
+
+import math
+from functools import cached_property
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Self, overload
+
+from .aliases import Box, Margins
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AbstractArea:
+    """
+    This is mostly a PosSize, margin manager
+
+    """
+
+    # names of the derived geometry values cached on the instance, see __init_subclass__
+    _geometry_names: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._geometry_names = _collect_cached_properties(cls)
+
+    def __init__(self, possize: Box) -> None:
+        self._x, self._y, self._width, self._height = possize
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        derived geometry is computed once and cached,
+        setting any attribute of the area (gutter, subdivisions, line_height...) invalidates it
+        """
+        if name in self._geometry_names:
+            raise AttributeError(f"can't set derived geometry attribute '{name}'")
+        super().__setattr__(name, value)
+        self._invalidate_geometry()
+
+    def _invalidate_geometry(self) -> None:
+        for name in self._geometry_names:
+            self.__dict__.pop(name, None)
+
+    @classmethod
+    def from_margins(cls, margins: Margins, *args: Any, page_size: tuple[float, float], **kwargs: Any) -> Self:
+        """
+        an area covering a page of page_size, inset by margins (negative values)
+        """
+        left_margin, bottom_margin, right_margin, top_margin = margins
+        page_width, page_height = page_size
+        possize = (
+            -left_margin,
+            -bottom_margin,
+            page_width + left_margin + right_margin,
+            page_height + bottom_margin + top_margin,
+        )
+        return cls(possize, *args, **kwargs)
+
+    @property
+    def x(self) -> float:
+        return self._x
+
+    @property
+    def y(self) -> float:
+        return self._y
+
+    @property
+    def width(self) -> float:
+        return self._width
+
+    @property
+    def height(self) -> float:
+        return self._height
+
+    @cached_property
+    def top(self) -> float:
+        """
+        the absolute y value of the top of the grid
+        """
+        return self._y + self._height
+
+    @property
+    def bottom(self) -> float:
+        """
+        the absolute y value of the bottom of the grid
+        """
+        return self.y
+
+    @property
+    def left(self) -> float:
+        """
+        the absolute x value of the left of the grid
+        """
+        return self.x
+
+    @cached_property
+    def right(self) -> float:
+        """
+        the absolute x value of the right of the grid
+        """
+        return self.x + self.width
+
+    @cached_property
+    def center(self) -> tuple[float, float]:
+        return self.horizontal_center, self.vertical_center
+
+    @cached_property
+    def horizontal_center(self) -> float:
+        return self.x + self.width / 2
+
+    @cached_property
+    def vertical_center(self) -> float:
+        return self.y + self.height / 2
+
+    def _geometry_key(self) -> tuple:
+        return (self.x, self.y, self.width, self.height)
+
+
+def _numpy() -> ModuleType | None:
+    """
+    NumPy is optional, and slow to import, so it's only imported by as_array
+    """
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def _collect_cached_properties(cls: type) -> frozenset[str]:
+    return frozenset(
+        name for klass in cls.__mro__ for name, value in vars(klass).items() if isinstance(value, cached_property)
+    )
+
+
+AbstractArea._geometry_names = _collect_cached_properties(AbstractArea)
+
+
+class AbstractGutterGrid(AbstractArea):
+    """
+    this is meant to be subclassed by Columns and Grid
+
+    """
+
+    def __init__(self, possize: Box, subdivisions: int = 8, gutter: float = 10) -> None:
+        super().__init__(possize)
+        self.subdivisions = subdivisions
+        self.gutter = gutter
+
+    @property
+    def _start_point(self) -> float:  # pragma: no cover
+        raise NotImplementedError
+
+    @property
+    def _end_point(self) -> float:  # pragma: no cover
+        raise NotImplementedError
+
+    @property
+    def _reference_dimension(self) -> float:
+        return self._end_point - self._start_point
+
+    @cached_property
+    def subdivision_dimension(self) -> float:
+        """
+        the absolute dimension of a single subdivision within the grid
+        """
+        return (self._reference_dimension - ((self.subdivisions - 1) * self.gutter)) / self.subdivisions
+
+    def span(self, span: float) -> float:
+        """
+        the absolute dimension of a span of consecutive subdivisions within the grid,
+        including their inbetween gutters
+        """
+        assert isinstance(span, (float, int))
+        if span >= 0:
+            return self.subdivision_dimension * span + self.gutter * (math.ceil(span) - 1)
+        else:
+            return self.subdivision_dimension * span + self.gutter * (math.ceil(span) + 1)
+
+    @overload
+    def __getitem__(self, key: int) -> float: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[float]: ...
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            positions = self._positions
+            return [positions[i] for i in range(*key.indices(len(self)))]
+
+        elif isinstance(key, int):
+            index = key
+            if index >= 0:
+                return self._start_point + index * (self.gutter + self.subdivision_dimension)
+            else:
+                return self._end_point + (index + 1) * (self.gutter + self.subdivision_dimension)
+
+        else:
+            raise TypeError(f"Wrong value input: {key}.")
+
+    def __len__(self) -> int:
+        return self.subdivisions
+
+    def __iter__(self) -> Iterator[float]:
+        yield from self._positions
+
+    def __mul__(self, factor: float) -> float:
+        return self.span(factor)
+
+    def _geometry_key(self) -> tuple:
+        return (*super()._geometry_key(), self.subdivisions, self.gutter)
+
+    def positions(self) -> list[float]:
+        """
+        the absolute coordinates of all the subdivisions, computed in a single pass
+        """
+        return list(self._positions)
+
+    @cached_property
+    def _positions(self) -> tuple[float, ...]:
+        start_point = self._start_point
+        step = self.gutter + self.subdivision_dimension
+        return tuple(start_point + i * step for i in range(self.subdivisions))
+
+    def as_array(self) -> "np.ndarray | list[float]":
+        """
+        same as positions(), as a NumPy array if NumPy is available
+        """
+        np = _numpy()
+        if np is None:  # pragma: no cover
+            return self.positions()
+        return self._start_point + np.arange(self.subdivisions) * (self.gutter + self.subdivision_dimension)
+
+
+class ColumnGrid(AbstractGutterGrid):
+    """
+    Column based grid, columns are refered to by index, see drawBotGrid.grid.ColumnGrid
+
+    """
+
+    @property
+    def columns(self) -> int:
+        return self.subdivisions
+
+    @cached_property
+    def column_width(self) -> float:
+        return self.subdivision_dimension
+
+    @property
+    def _start_point(self) -> float:
+        return self.left
+
+    @property
+    def _end_point(self) -> float:
+        return self.right
+
+
+class RowGrid(AbstractGutterGrid):
+    """
+    Row-based grid implementation
+
+    """
+
+    @property
+    def rows(self) -> int:
+        return self.subdivisions
+
+    @cached_property
+    def row_height(self) -> float:
+        return self.subdivision_dimension
+
+    @property
+    def _start_point(self) -> float:
+        return self.bottom
+
+    @property
+    def _end_point(self) -> float:
+        return self.top
+
+
+class Grid(AbstractGutterGrid):
+    """
+    Combined column and row grid
+
+    """
+
+    column_grid_class = ColumnGrid
+    row_grid_class = RowGrid
+
+    def __init__(
+        self,
+        possize: Box,
+        column_subdivisions: int = 8,
+        row_subdivisions: int = 8,
+        column_gutter: float = 10,
+        row_gutter: float = 10,
+    ) -> None:
+        self.columns = self.column_grid_class(possize, column_subdivisions, column_gutter)
+        self.rows = self.row_grid_class(possize, row_subdivisions, row_gutter)
+        super().__init__(possize)
+
+    @property
+    def _reference_dimension(self) -> float:  # pragma: no cover
+        return 0.0  # Not used in this implementation
+
+    @property
+    def _start_point(self) -> float:  # pragma: no cover
+        return 0.0  # Not used in this implementation
+
+    @property
+    def _end_point(self) -> float:  # pragma: no cover
+        return 0.0  # Not used in this implementation
+
+    @property
+    def column_width(self) -> float:
+        return self.columns.column_width
+
+    @property
+    def row_height(self) -> float:
+        return self.rows.row_height
+
+    @cached_property
+    def subdivision_dimension(self) -> float:  # pragma: no cover
+        return 0.0  # Not used in this implementation
+
+    def column_span(self, span: float) -> float:
+        return self.columns.span(span)
+
+    def row_span(self, span: float) -> float:
+        return self.rows.span(span)
+
+    def span(self, column_span_row_span: tuple[float, float]) -> tuple[float, float]:
+        column_span, row_span = column_span_row_span
+        return self.column_span(column_span), self.row_span(row_span)
+
+    def __getitem__(self, index: tuple[int, int]) -> tuple[float, float]:
+        column_index, row_index = index
+        assert isinstance(column_index, int) and isinstance(row_index, int)
+        x = self.columns[column_index]
+        y = self.rows[row_index]
+        assert isinstance(x, float) and isinstance(y, float)
+        return x, y
+
+    def __len__(self) -> int:
+        return len(self.columns) * len(self.rows)
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        yield from self.cell_positions()
+
+    def cell_positions(self) -> list[tuple[float, float]]:
+        """
+        the (x, y) origins of all the cells, row by row
+        """
+        columns = self.columns.positions()
+        return [(col, row) for row in self.rows.positions() for col in columns]
+
+    def cells_as_array(self) -> "np.ndarray | list[tuple[float, float]]":
+        """
+        the (x, y) origins of all the cells, as a NumPy array of shape (rows, columns, 2) if NumPy is available
+        """
+        np = _numpy()
+        if np is None:  # pragma: no cover
+            return self.cell_positions()
+        return np.stack(np.meshgrid(self.columns.as_array(), self.rows.as_array()), axis=-1)
+
+    def _geometry_key(self) -> tuple:
+        return (self.columns._geometry_key(), self.rows._geometry_key())
+
+
+class BaselineGrid(AbstractArea):
+    """
+    Baseline grid implementation
+
+    """
+
+    def __init__(self, possize: Box, line_height: float) -> None:
+        self.input_possize = possize
+        super().__init__(possize)
+        self.line_height = line_height
+
+    @property
+    def _start_point(self) -> float:
+        return self.top
+
+    @property
+    def _end_point(self) -> float:
+        return self.y
+
+    @property
+    def bottom(self) -> float:
+        """the absolute y value of the bottom of the grid"""
+        return self._last_line
+
+    @property
+    def height(self) -> float:
+        """height is overwritten with the actual distance from last to first line"""
+        return self.top - self._last_line
+
+    @cached_property
+    def _last_line(self) -> float:
+        value = self[-1]
+        assert isinstance(value, float | int)
+        return value
+
+    @property
+    def _reference_dimension(self) -> float:
+        return self._end_point - self._start_point
+
+    @cached_property
+    def subdivisions(self) -> int:
+        return abs(int(self._reference_dimension // self.subdivision_dimension)) + 1
+
+    @property
+    def subdivision_dimension(self) -> float:
+        """the absolute dimension of a single subdivision within the grid"""
+        return -self.line_height
+
+    def span(self, span: float) -> float:
+        """
+        the absolute dimension of a span of consecutive subdivisions within the grid,
+        including their inbetween gutters
+        """
+        return span * self.subdivision_dimension
+
+    def _first_line_index(self, y_coordinate: float, strict: bool, lines_count: int) -> int | None:
+        """
+        index of the first line (from the top) lying below y_coordinate, or None if there is no such line.
+        The index is guessed arithmetically, then nudged against the actual line values,
+        so that float rounding can't make it disagree with the lines returned by __getitem__
+        """
+        offset = (self.top - y_coordinate) / self.line_height
+        index = math.floor(offset) + 1 if strict else math.ceil(offset)
+        index = min(max(0, index), lines_count)
+
+        def is_below(line: float) -> bool:
+            return y_coordinate > line if strict else y_coordinate >= line
+
+        while index > 0 and is_below(self[index - 1]):
+            index -= 1
+        while index < lines_count and not is_below(self[index]):
+            index += 1
+        return index if index < lines_count else None
+
+    def baseline_index_from_coordinate(self, y_coordinate: float) -> int | None:
+        return self._first_line_index(y_coordinate, strict=False, lines_count=len(self))
+
+    def closest_line_below_coordinate(self, y_coordinate: float) -> float | None:
+        index = self._first_line_index(y_coordinate, strict=False, lines_count=len(self))
+        return self[index] if index is not None else None
+
+    def closest_line_above_coordinate(self, y_coordinate: float) -> float | None:
+        index = self._first_line_index(y_coordinate, strict=True, lines_count=len(self))
+        return self[index] + self.line_height if index is not None else None
+
+    def closest_lines_below_coordinates(self, y_coordinates: Iterable[float]) -> list[float | None]:
+        """
+        batch version of closest_line_below_coordinate
+        """
+        lines_count = len(self)
+        indexes = [self._first_line_index(y, strict=False, lines_count=lines_count) for y in y_coordinates]
+        return [self[i] if i is not None else None for i in indexes]
+
+    def closest_lines_above_coordinates(self, y_coordinates: Iterable[float]) -> list[float | None]:
+        """
+        batch version of closest_line_above_coordinate
+        """
+        lines_count = len(self)
+        indexes = [self._first_line_index(y, strict=True, lines_count=lines_count) for y in y_coordinates]
+        return [self[i] + self.line_height if i is not None else None for i in indexes]
+
+    @overload
+    def __getitem__(self, key: int) -> float: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[float]: ...
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            positions = self._positions
+            return [positions[i] for i in range(*key.indices(len(self)))]
+
+        elif isinstance(key, int):
+            index = key
+            if index >= 0:
+                return self._start_point + index * self.subdivision_dimension
+            else:
+                return self._start_point + len(self) * self.subdivision_dimension + index * self.subdivision_dimension
+
+        else:
+            raise TypeError(f"Wrong value input: {key}.")
+
+    def __len__(self) -> int:
+        return self.subdivisions
+
+    def __iter__(self) -> Iterator[float]:
+        yield from self._positions
+
+    def __mul__(self, factor: float) -> float:
+        return self.span(factor)
+
+    def positions(self) -> list[float]:
+        """
+        the absolute y coordinates of all the lines, from top to bottom
+        """
+        return list(self._positions)
+
+    @cached_property
+    def _positions(self) -> tuple[float, ...]:
+        start_point = self._start_point
+        step = self.subdivision_dimension
+        return tuple(start_point + i * step for i in range(self.subdivisions))
+
+    def as_array(self) -> "np.ndarray | list[float]":
+        """
+        same as positions(), as a NumPy array if NumPy is available
+        """
+        np = _numpy()
+        if np is None:  # pragma: no cover
+            return self.positions()
+        return self._start_point + np.arange(self.subdivisions) * self.subdivision_dimension
+
+    def _geometry_key(self) -> tuple:
+        return (*super()._geometry_key(), self.line_height)
@@ -1,189 +1,112 @@
-import math
-from typing import Any, Iterator, Self, overload
+"""
+The grids, drawable with DrawBot. Their geometry comes from drawBotGrid.geometry.
+"""
+
+from collections import OrderedDict
+from typing import Any, Self
 
 import drawBot as db
 from drawBot.aliases import RGBAColorTuple
 
-from .aliases import Box, Margins
+from . import geometry
+from .aliases import Margins
+from .instrumentation import instrumented
+
+# frame and index paths shared by grids with the same geometry, see AbstractArea.draw
+_path_cache: OrderedDict[tuple, db.BezierPath] = OrderedDict()
+_PATH_CACHE_SIZE = 32
 
 
-class AbstractArea:
+def _current_font() -> tuple[str, int]:
     """
-    This is mostly a PosSize, margin manager
+    the font set with font(), index labels are drawn with it like any text would be
+    """
+    text_state = db._drawBotDrawingTool._dummyContext._state.text
+    return text_state._font, text_state._fontNumber
+
 
+class AbstractArea(geometry.AbstractArea):
     """
+    This is mostly a PosSize, margin manager
 
-    def __init__(self, possize: Box) -> None:
-        self._x, self._y, self._width, self._height = possize
+    """
 
     @classmethod
-    def from_margins(cls, margins: Margins, *args: Any, **kwargs: Any) -> Self:
-        left_margin, bottom_margin, right_margin, top_margin = margins
-        possize = (
-            -left_margin,
-            -bottom_margin,
-            db.width() + left_margin + right_margin,
-            db.height() + bottom_margin + top_margin,
-        )
-        return cls(possize, *args, **kwargs)
-
-    @property
-    def x(self) -> float:
-        return self._x
-
-    @property
-    def y(self) -> float:
-        return self._y
-
-    @property
-    def width(self) -> float:
-        return self._width
-
-    @property
-    def height(self) -> float:
-        return self._height
-
-    @property
-    def top(self) -> float:
+    def from_margins(
+        cls, margins: Margins, *args: Any, page_size: tuple[float, float] | None = None, **kwargs: Any
+    ) -> Self:
         """
-        the absolute y value of the top of the grid
+        an area covering the current page, or a page of page_size, inset by margins (negative values)
         """
-        return self._y + self._height
+        if page_size is None:
+            page_size = db.width(), db.height()
+        return super().from_margins(margins, *args, page_size=page_size, **kwargs)
 
-    @property
-    def bottom(self) -> float:
-        """
-        the absolute y value of the bottom of the grid
-        """
-        return self.y
+    draw_color: RGBAColorTuple = (1, 0, 1, 1)
+    index_font_size: float = 5
 
-    @property
-    def left(self) -> float:
+    @instrumented
+    def draw(self, show_index: bool = False, cache_path: bool = False) -> None:
         """
-        the absolute x value of the left of the grid
-        """
-        return self.x
+        The frame, and the indexes if required, are drawn as a single path each.
 
-    @property
-    def right(self) -> float:
-        """
-        the absolute x value of the right of the grid
+        With cache_path, the paths are kept for any grid with the same geometry,
+        so drawing the same grid on many pages only builds them once.
         """
-        return self.x + self.width
-
-    @property
-    def center(self) -> tuple[float, float]:
-        return self.horizontal_center, self.vertical_center
-
-    @property
-    def horizontal_center(self) -> float:
-        return self.x + self.width / 2
-
-    @property
-    def vertical_center(self) -> float:
-        return self.y + self.height / 2
-
-    draw_color: RGBAColorTuple = (1, 0, 1, 1)
-
-    def draw(self, show_index: bool = False) -> None:
         with db.savedState():
             db.stroke(*self.draw_color)
             db.fill(None)
             db.strokeWidth(0.5)
-            self.draw_frame()
+            db.drawPath(self._get_path("frame", cache_path))
 
         if show_index:
             with db.savedState():
                 db.stroke(None)
                 db.fill(*self.draw_color)
-                db.fontSize(5)
-                self.draw_indexes()
-
-    def draw_frame(self) -> None:  # pragma: no cover
-        raise NotImplementedError
-
-    def draw_indexes(self) -> None:  # pragma: no cover
-        raise NotImplementedError
-
-
-class AbstractGutterGrid(AbstractArea):
-    """
-    this is meant to be subclassed by Columns and Grid
-
-    """
+                db.drawPath(self._get_path("indexes", cache_path))
+
+    def _get_path(self, kind: str, cache_path: bool) -> db.BezierPath:
+        build_path = self.frame_path if kind == "frame" else self.indexes_path
+        if not cache_path:
+            return build_path()
+
+        # the labels are outlines of the current font
+        font = _current_font() if kind == "indexes" else None
+        key = (type(self), kind, self.index_font_size, font, self._geometry_key())
+        path = _path_cache.get(key)
+        if path is None:
+            path = _path_cache[key] = build_path()
+            if len(_path_cache) > _PATH_CACHE_SIZE:
+                _path_cache.popitem(last=False)
+        else:
+            _path_cache.move_to_end(key)
+        return path
 
-    def __init__(self, possize: Box, subdivisions: int = 8, gutter: float = 10) -> None:
-        super().__init__(possize)
-        self.subdivisions = subdivisions
-        self.gutter = gutter
+    def _index_path(self, path: db.BezierPath, index: str, x: float, y: float) -> None:
+        font, font_number = _current_font()
+        path.text(index, offset=(x + 2, y + 2), font=font, fontSize=self.index_font_size, fontNumber=font_number)
 
-    @property
-    def _start_point(self) -> float:  # pragma: no cover
+    def frame_path(self) -> db.BezierPath:  # pragma: no cover
         raise NotImplementedError
 
-    @property
-    def _end_point(self) -> float:  # pragma: no cover
+    def indexes_path(self) -> db.BezierPath:  # pragma: no cover
         raise NotImplementedError
 
-    @property
-    def _reference_dimension(self) -> float:
-        return self._end_point - self._start_point
-
-    @property
-    def subdivision_dimension(self) -> float:
-        """
-        the absolute dimension of a single subdivision within the grid
-        """
-        return (self._reference_dimension - ((self.subdivisions - 1) * self.gutter)) / self.subdivisions
-
-    def span(self, span: float) -> float:
-        """
-        the absolute dimension of a span of consecutive subdivisions within the grid,
-        including their inbetween gutters
-        """
-        assert isinstance(span, (float, int))
-        if span >= 0:
-            return self.subdivision_dimension * span + self.gutter * (math.ceil(span) - 1)
-        else:
-            return self.subdivision_dimension * span + self.gutter * (math.ceil(span) + 1)
-
-    @overload
-    def __getitem__(self, key: int) -> float: ...
-
-    @overload
-    def __getitem__(self, key: slice) -> list[float]: ...
-
-    def __getitem__(self, key):
-        if isinstance(key, slice):
-            values = []
-            for i in range(*key.indices(len(self))):
-                values.append(self[i])
-            return values
-
-        elif isinstance(key, int):
-            index = key
-            if index >= 0:
-                return self._start_point + index * (self.gutter + self.subdivision_dimension)
-            else:
-                return self._end_point + (index + 1) * (self.gutter + self.subdivision_dimension)
+    def draw_frame(self) -> None:
+        db.drawPath(self.frame_path())
 
-        else:
-            raise TypeError(f"Wrong value input: {key}.")
+    def draw_indexes(self) -> None:
+        db.drawPath(self.indexes_path())
 
-    def __len__(self) -> int:
-        return self.subdivisions
 
-    def __iter__(self) -> Iterator[float]:
-        for i in range(self.subdivisions):
-            value = self.__getitem__(i)
-            assert isinstance(value, float | int)
-            yield value
+class AbstractGutterGrid(AbstractArea, geometry.AbstractGutterGrid):
+    """
+    this is meant to be subclassed by Columns and Grid
 
-    def __mul__(self, factor: float) -> float:
-        return self.span(factor)
+    """
 
 
-class ColumnGrid(AbstractGutterGrid):
+class ColumnGrid(AbstractGutterGrid, geometry.ColumnGrid):
     """
     Will return coordinates according to a column based grid.
 
@@ -234,244 +157,78 @@ class ColumnGrid(AbstractGutterGrid):
 
     """
 
-    @property
-    def columns(self) -> int:
-        return self.subdivisions
-
-    @property
-    def column_width(self) -> float:
-        return self.subdivision_dimension
-
-    @property
-    def _start_point(self) -> float:
-        return self.left
-
-    @property
-    def _end_point(self) -> float:
-        return self.right
-
-    def draw_frame(self):
+    def frame_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for column in self:
-            db.rect(column, self.bottom, self.column_width, self.height)
+            path.rect(column, self.bottom, self.column_width, self.height)
+        return path
 
-    def draw_indexes(self):
+    def indexes_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for i, column in enumerate(self):
-            db.text(str(i), (column + 2, self.bottom + 2))
+            self._index_path(path, str(i), column, self.bottom)
+        return path
 
 
-class RowGrid(AbstractGutterGrid):
+class RowGrid(AbstractGutterGrid, geometry.RowGrid):
     """
     Row-based grid implementation
 
     """
 
-    @property
-    def rows(self) -> int:
-        return self.subdivisions
-
-    @property
-    def row_height(self) -> float:
-        return self.subdivision_dimension
-
-    @property
-    def _start_point(self) -> float:
-        return self.bottom
-
-    @property
-    def _end_point(self) -> float:
-        return self.top
-
-    def draw_frame(self) -> None:
+    def frame_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for row in self:
-            db.line((self.left, row), (self.right, row))
+            path.line((self.left, row), (self.right, row))
+        return path
 
-    def draw_indexes(self) -> None:
+    def indexes_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for index, row in enumerate(self):
-            db.text(str(index), (self.left + 2, row + 2))
+            self._index_path(path, str(index), self.left, row)
+        return path
 
 
-class Grid(AbstractGutterGrid):
+class Grid(AbstractGutterGrid, geometry.Grid):
     """
     Combined column and row grid
 
     """
 
-    def __init__(
-        self,
-        possize: Box,
-        column_subdivisions: int = 8,
-        row_subdivisions: int = 8,
-        column_gutter: float = 10,
-        row_gutter: float = 10,
-    ) -> None:
-        self.columns = ColumnGrid(possize, column_subdivisions, column_gutter)
-        self.rows = RowGrid(possize, row_subdivisions, row_gutter)
-        super().__init__(possize)
-
-    @property
-    def _reference_dimension(self) -> float:  # pragma: no cover
-        return 0.0  # Not used in this implementation
-
-    @property
-    def _start_point(self) -> float:  # pragma: no cover
-        return 0.0  # Not used in this implementation
-
-    @property
-    def _end_point(self) -> float:  # pragma: no cover
-        return 0.0  # Not used in this implementation
-
-    @property
-    def column_width(self) -> float:
-        return self.columns.column_width
-
-    @property
-    def row_height(self) -> float:
-        return self.rows.row_height
-
-    @property
-    def subdivision_dimension(self) -> float:  # pragma: no cover
-        return 0.0  # Not used in this implementation
-
-    def column_span(self, span: float) -> float:
-        return self.columns.span(span)
-
-    def row_span(self, span: float) -> float:
-        return self.rows.span(span)
-
-    def span(self, column_span_row_span: tuple[float, float]) -> tuple[float, float]:
-        column_span, row_span = column_span_row_span
-        return self.column_span(column_span), self.row_span(row_span)
-
-    def __getitem__(self, index: tuple[int, int]) -> tuple[float, float]:
-        column_index, row_index = index
-        assert isinstance(column_index, int) and isinstance(row_index, int)
-        x = self.columns[column_index]
-        y = self.rows[row_index]
-        assert isinstance(x, float) and isinstance(y, float)
-        return x, y
-
-    def __len__(self) -> int:
-        return len(self.columns) * len(self.rows)
-
-    def __iter__(self) -> Iterator[tuple[float, float]]:
-        for row in self.rows:
-            for col in self.columns:
-                yield (col, row)
+    column_grid_class: type[ColumnGrid] = ColumnGrid
+    row_grid_class: type[RowGrid] = RowGrid
+    columns: ColumnGrid
+    rows: RowGrid
 
-    def draw_frame(self) -> None:
-        self.columns.draw_frame()
-        self.rows.draw_frame()
+    def frame_path(self) -> db.BezierPath:
+        path = self.columns.frame_path()
+        path.appendPath(self.rows.frame_path())
+        return path
 
-    def draw_indexes(self) -> None:
+    def indexes_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for index_col, col in enumerate(self.columns):
             for index_row, row in enumerate(self.rows):
-                db.text(f"({index_col}, {index_row})", (col + 2, row + 2))
+                self._index_path(path, f"({index_col}, {index_row})", col, row)
+        return path
 
 
-class BaselineGrid(AbstractArea):
+class BaselineGrid(AbstractArea, geometry.BaselineGrid):
     """
     Baseline grid implementation
 
     """
 
-    def __init__(self, possize: Box, line_height: float) -> None:
-        self.input_possize = possize
-        super().__init__(possize)
-        self.line_height = line_height
-
-    @property
-    def _start_point(self) -> float:
-        return self.top
-
-    @property
-    def _end_point(self) -> float:
-        return self.y
-
-    @property
-    def bottom(self) -> float:
-        """the absolute y value of the bottom of the grid"""
-        value = self[-1]
-        assert isinstance(value, float | int)
-        return value
-
-    @property
-    def height(self) -> float:
-        """height is overwritten with the actual distance from last to first line"""
-        return self.top - self.bottom
-
-    @property
-    def _reference_dimension(self) -> float:
-        return self._end_point - self._start_point
-
-    @property
-    def subdivisions(self) -> int:
-        return abs(int(self._reference_dimension // self.subdivision_dimension)) + 1
-
-    @property
-    def subdivision_dimension(self) -> float:
-        """the absolute dimension of a single subdivision within the grid"""
-        return -self.line_height
-
-    def span(self, span: float) -> float:
-        """
-        the absolute dimension of a span of consecutive subdivisions within the grid,
-        including their inbetween gutters
-        """
-        return span * self.subdivision_dimension
-
-    def baseline_index_from_coordinate(self, y_coordinate: float) -> int | None:
-        for i, line in sorted(enumerate(self)):
-            if y_coordinate >= line:
-                return i
-
-    def closest_line_below_coordinate(self, y_coordinate: float) -> float | None:
-        for i, line in sorted(enumerate(self)):
-            if y_coordinate >= line:
-                return line
-
-    def closest_line_above_coordinate(self, y_coordinate: float) -> float | None:
-        for i, line in sorted(enumerate(self)):
-            if y_coordinate > line:
-                return line + self.line_height
-
-    @overload
-    def __getitem__(self, key: int) -> float: ...
-
-    @overload
-    def __getitem__(self, key: slice) -> list[float]: ...
-
-    def __getitem__(self, key):
-        if isinstance(key, slice):
-            return [self[i] for i in range(*key.indices(len(self)))]
-
-        elif isinstance(key, int):
-            index = key
-            if index >= 0:
-                return self._start_point + index * self.subdivision_dimension
-            else:
-                return self._start_point + len(self) * self.subdivision_dimension + index * self.subdivision_dimension
-
-        else:
-            raise TypeError(f"Wrong value input: {key}.")
-
-    def __len__(self) -> int:
-        return self.subdivisions
-
-    def __iter__(self) -> Iterator[float]:
-        for i in range(self.subdivisions):
-            value = self.__getitem__(i)
-            assert isinstance(value, float | int)
-            yield value
-
-    def __mul__(self, factor: float) -> float:
-        return self.span(factor)
-
     draw_color: RGBAColorTuple = (0, 1, 1, 1)
 
-    def draw_frame(self) -> None:
+    def frame_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for line in self:
-            db.line((self.left, line), (self.right, line))
+            path.line((self.left, line), (self.right, line))
+        return path
 
-    def draw_indexes(self) -> None:
+    def indexes_path(self) -> db.BezierPath:
+        path = db.BezierPath()
         for index, line in enumerate(self):
-            db.text(str(index), (self.left + 2, line + 2))
+            self._index_path(path, str(index), self.left, line)
+        return path
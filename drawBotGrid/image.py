@@ -1,13 +1,181 @@
-import tempfile
+import io
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Sequence, TypeAlias
 
+import AppKit
 import drawBot as db
 from drawBot.aliases import SomePath
-from PIL import Image
+from PIL import Image, ImageOps
 
-from drawBotGrid.aliases import Box, ImageAnchor, ImageFitting
+from drawBotGrid.aliases import Box, ImageAnchor, ImageFitting, Point
+from drawBotGrid.instrumentation import instrumented, span
 
+if TYPE_CHECKING:
+    import numpy as np
+    from AppKit import NSImage
+else:
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover
+        np = None
 
+# x_min, y_min, x_max, y_max in image pixels
+PixelBox: TypeAlias = tuple[int, int, int, int]
+
+
+class ImageCache:
+    """
+    LRU cache for image sizes, decoded and cropped images, shared by the functions of this module.
+
+    Entries are keyed by the image path along with its modification time and file size,
+    so an image changed on disk is read again.
+    The least recently used entries are dropped once the cached images exceed max_bytes.
+    It can be shared by threads, values are computed outside the lock.
+
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._items: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                value, _ = self._items[key]
+                return value
+            self.misses += 1
+
+        value = compute()
+        size = _get_cached_value_size(value)
+        with self._lock:
+            if key in self._items:
+                # computed meanwhile by another thread
+                self.total_bytes -= self._items[key][1]
+            self._items[key] = value, size
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._items) > 1:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def values(self, kind: str) -> list[Any]:
+        """
+        the cached values of one kind ("size", "decoded", "crop" or "encoded"), least recently used first
+        """
+        with self._lock:
+            return [value for key, (value, _) in self._items.items() if isinstance(key, tuple) and key[0] == kind]
+
+    def info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._items),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+image_cache = ImageCache()
+
+_default_target_dpi: float | None = None
+
+
+def _get_cached_value_size(value: Any) -> int:
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], bytes):
+        return len(value[1])
+    return 64
+
+
+def _file_key(path: SomePath) -> Hashable | None:
+    """
+    identifies the content of an image file, or None if it can't be read from disk (an url...)
+    """
+    try:
+        path = os.fspath(path)
+        stat = os.stat(path)
+    except (TypeError, OSError):
+        return None
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _cached(kind: str, path: SomePath, compute: Callable[[], Any], *key: Hashable) -> Any:
+    file_key = _file_key(path)
+    if file_key is None:
+        return compute()
+    return image_cache.get((kind, file_key, *key), compute)
+
+
+# orientations 5 to 8 swap the width and height of the image
+_EXIF_ORIENTATION_TAG = 0x0112
+_EXIF_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _image_size(path: SomePath) -> tuple[float, float]:
+    width, height, _ = _cached("size", path, lambda: _probe_image(path))
+    return width, height
+
+
+def _is_transposed(path: SomePath) -> bool:
+    """
+    True if the image pixels have to be rotated or flipped according to the EXIF orientation
+    """
+    _, _, transposed = _cached("size", path, lambda: _probe_image(path))
+    return transposed
+
+
+def _probe_image(path: SomePath) -> tuple[float, float, bool]:
+    """
+    reads the image dimensions from the file header only, without decoding the pixels,
+    taking the EXIF orientation into account.
+    Formats PIL can't read (pdf...) are measured by drawBot
+    """
+    try:
+        with Image.open(path) as im:
+            width, height = im.size
+            orientation = im.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+    except OSError:
+        width, height = db.imageSize(path)
+        return width, height, False
+    if orientation in _EXIF_ROTATED_ORIENTATIONS:
+        width, height = height, width
+    return width, height, orientation != 1
+
+
+def _decoded_image(path: SomePath) -> Image.Image:
+    def decode() -> Image.Image:
+        with Image.open(path) as im:
+            im.load()
+            # crop boxes are computed on the oriented image, see _probe_image
+            return ImageOps.exif_transpose(im)
+
+    return _cached("decoded", path, decode)
+
+
+@instrumented
 def image_at_size(path: SomePath, box: Box, preserve_proportions: bool = True):
     """
     this could do a lot more.
@@ -16,7 +184,7 @@ def image_at_size(path: SomePath, box: Box, preserve_proportions: bool = True):
 
     """
     x, y, w, h = box
-    actual_w, actual_h = db.imageSize(path)
+    actual_w, actual_h = _image_size(path)
     if not w:
         scale_ratio_w = h / actual_h
         scale_ratio_h = h / actual_h
@@ -32,15 +200,21 @@ def image_at_size(path: SomePath, box: Box, preserve_proportions: bool = True):
             scale_ratio_w = scale_ratio
             scale_ratio_h = scale_ratio
 
+    # drawBot places the file pixels as stored, ignoring the EXIF orientation
+    im_source = path
+    if _is_transposed(path):
+        im_source = _cropped_image_source(path, (0, 0, round(actual_w), round(actual_h)))
+
     with db.savedState():
         db.translate(x, y)
         db.scale(scale_ratio_w, scale_ratio_h)
-        db.image(path, (0, 0))
+        db.image(im_source, (0, 0))
 
 
 imageAtSize = image_at_size
 
 
+@instrumented
 def image_box(
     path: SomePath,
     box: Box,
@@ -48,112 +222,343 @@ def image_box(
     scale: float = 1,
     anchor: ImageAnchor = ("left", "top"),
     draw_box_frame: bool = False,
+    target_dpi: float | None = None,
     **kwargs,
 ) -> Box:
-    assert fitting in {"fit", "fill", "crop"}, f"`fitting` value not admitted: {fitting}"
+    """
+    Places an image in a box, fitting, filling or cropping it from the given anchor.
+
+    With a target_dpi (or a default one set with set_image_target_dpi),
+    images with more pixels than needed at that resolution are resampled before being placed.
+    """
+    placement = _prepare_image_box(path, box, fitting=fitting, scale=scale, anchor=anchor, target_dpi=target_dpi)
+    return _place_image_box(placement, box, draw_box_frame=draw_box_frame, **kwargs)
 
-    im_path = Path(path)
-    with tempfile.NamedTemporaryFile(suffix=im_path.suffix, delete=False) as im_cropped:
-        x, y, w, h = box
 
-        # get the scale ratio
-        image_w, image_h = db.imageSize(path)
-        scale_ratio_w = w / image_w
-        scale_ratio_h = h / image_h
-        if fitting == "fit":
-            scale_ratio = min(scale_ratio_w, scale_ratio_h)
-        elif fitting == "fill":
-            scale_ratio = max(scale_ratio_w, scale_ratio_h)
-        elif fitting == "crop":
-            scale_ratio = scale
-
-        crop_width, crop_height = _crop_image_with_anchor(
-            path,
-            im_cropped.name,
-            anchor,
-            w / scale_ratio,
-            h / scale_ratio,
-        )
-
-        im_width, im_height = db.imageSize(im_cropped.name)
-        im_width_scaled = im_width * scale_ratio
-        im_height_scaled = im_height * scale_ratio
-        anchor_x, anchor_y = anchor
-
-        if anchor_x == "left":
-            offset_x = x
-        elif anchor_x == "right":
-            offset_x = x + w - im_width_scaled
-        elif anchor_x == "center":
-            offset_x = x + (w - im_width_scaled) / 2
-        else:  # pragma: no cover   - this can't really fail since they are covered into _crop_image_with_anchor
-            raise ValueError(f"`anchor_x` value not admitted: {anchor_x}")
-
-        if anchor_y == "bottom":
-            offset_y = y
-        elif anchor_y == "top":
-            offset_y = y + h - im_height_scaled
-        elif anchor_y == "center":
-            offset_y = y + (h - im_height_scaled) / 2
-        else:  # pragma: no cover   - this can't really fail since they are covered into _crop_image_with_anchor
-            raise ValueError(f"`anchor_y` value not admitted: {anchor_y}")
+# image source, (offset_x, offset_y), (scale_x, scale_y), placed box
+ImagePlacement: TypeAlias = "tuple[SomePath | NSImage, Point, tuple[float, float], Box]"
+
+
+def _prepare_image_box(
+    path: SomePath,
+    box: Box,
+    fitting: ImageFitting = "fit",
+    scale: float = 1,
+    anchor: ImageAnchor = ("left", "top"),
+    target_dpi: float | None = None,
+) -> ImagePlacement:
+    """
+    everything image_box does before drawing: the layout, cropping, resampling and encoding.
+    It doesn't touch the drawBot state, so it can run in a worker thread
+    """
+    image_size = _image_size(path)
+    placed_box, pixel_box, scale_ratio = _get_image_box_layout(image_size, box, fitting, scale, anchor)
+    offset_x, offset_y, _, _ = placed_box
+
+    x_min, y_min, x_max, y_max = pixel_box
+    im_width, im_height = x_max - x_min, y_max - y_min
+    im_width_scaled = im_width * scale_ratio
+    im_height_scaled = im_height * scale_ratio
+
+    if target_dpi is None:
+        target_dpi = _default_target_dpi
+    target_size = _get_target_pixel_size((im_width, im_height), (im_width_scaled, im_height_scaled), target_dpi)
+
+    if target_size is None:
+        if pixel_box == (0, 0, *image_size) and not _is_transposed(path):
+            # the crop is the whole image, place the original file
+            im_source = path
+        else:
+            im_source = _cropped_image_source(path, pixel_box)
+        image_scale = scale_ratio, scale_ratio
+    else:
+        im_source = _cropped_image_source(path, pixel_box, target_size)
+        target_width, target_height = target_size
+        image_scale = im_width_scaled / target_width, im_height_scaled / target_height
 
+    return im_source, (offset_x, offset_y), image_scale, placed_box
+
+
+def _place_image_box(placement: ImagePlacement, box: Box, draw_box_frame: bool = False, **kwargs) -> Box:
+    im_source, offset, image_scale, placed_box = placement
+    with span("image_box.place"), db.savedState():
+        db.translate(*offset)
+        db.scale(*image_scale)
+        db.image(im_source, (0, 0), **kwargs)
+
+    if draw_box_frame:
+        grid_color = (0.5, 0, 0.8, 1)
         with db.savedState():
-            db.translate(offset_x, offset_y)
-            db.scale(scale_ratio, scale_ratio)
-            db.image(im_cropped.name, (0, 0), **kwargs)
+            db.strokeWidth(0.5)
+            db.fill(None)
+            db.stroke(*grid_color)
+            db.rect(*box)
 
-        if draw_box_frame:
-            grid_color = (0.5, 0, 0.8, 1)
-            with db.savedState():
-                db.strokeWidth(0.5)
-                db.fill(None)
-                db.stroke(*grid_color)
-                db.rect(*box)
+    return placed_box
 
-        return offset_x, offset_y, crop_width * scale_ratio, crop_height * scale_ratio
 
+def image_box_layout(
+    image_size: tuple[float, float],
+    box: Box,
+    fitting: ImageFitting = "fit",
+    scale: float = 1,
+    anchor: ImageAnchor = ("left", "top"),
+) -> tuple[Box, PixelBox]:
+    """
+    The geometry of image_box from the image dimensions alone, without reading, cropping or drawing anything.
+    Returns the placed box, the same image_box returns, and the crop box in image pixels (x_min, y_min, x_max, y_max).
 
-def _crop_image_with_anchor(
-    input_path: SomePath,
-    output_path: SomePath,
-    anchor,
-    crop_width: float,
-    crop_height: float,
-) -> tuple[float, float]:
-    anchor_x, anchor_y = anchor
-    im_width, im_height = db.imageSize(input_path)
+    ```
+    placed_box, crop_box = image_box_layout(imageSize("photo.jpg"), (0, 0, 100, 100), fitting="fill")
+    ```
+    """
+    placed_box, pixel_box, _ = _get_image_box_layout(image_size, box, fitting, scale, anchor)
+    return placed_box, pixel_box
 
-    crop_width = min(crop_width, im_width)
-    crop_height = min(crop_height, im_height)
 
-    if anchor_x == "left":
-        crop_x = 0
-    elif anchor_x == "right":
-        crop_x = im_width - crop_width
-    elif anchor_x == "center":
-        crop_x = (im_width - crop_width) / 2
-    else:
-        raise ValueError(f"`anchor_x` value not admitted: {anchor_x}")
+imageBoxLayout = image_box_layout
 
-    if anchor_y == "bottom":
-        crop_y = 0
-    elif anchor_y == "top":
-        crop_y = im_height - crop_height
-    elif anchor_y == "center":
-        crop_y = (im_height - crop_height) / 2
-    else:
-        raise ValueError(f"`anchor_y` value not admitted: {anchor_y}")
 
+def image_box_layouts(
+    image_sizes: Sequence[tuple[float, float]],
+    boxes: Sequence[Box],
+    fitting: ImageFitting = "fit",
+    scale: float = 1,
+    anchor: ImageAnchor = ("left", "top"),
+) -> "tuple[np.ndarray, np.ndarray] | tuple[list[Box], list[PixelBox]]":
+    """
+    image_box_layout for many boxes at once, image_sizes and boxes have the same length.
+    Returns the placed boxes and the crop boxes as NumPy arrays of shape (n, 4) if NumPy is available,
+    as lists of tuples otherwise.
+    """
+    if np is None:  # pragma: no cover
+        layouts = [image_box_layout(size, box, fitting, scale, anchor) for size, box in zip(image_sizes, boxes)]
+        return [placed_box for placed_box, _ in layouts], [pixel_box for _, pixel_box in layouts]
+
+    assert fitting in {"fit", "fill", "crop"}, f"`fitting` value not admitted: {fitting}"
+    factor_x, factor_y = _get_anchor_factors(anchor)
+
+    image_w, image_h = np.asarray(image_sizes, dtype=float).reshape(-1, 2).T
+    x, y, w, h = np.asarray(boxes, dtype=float).reshape(-1, 4).T
+
+    if fitting == "fit":
+        scale_ratio = np.minimum(w / image_w, h / image_h)
+    elif fitting == "fill":
+        scale_ratio = np.maximum(w / image_w, h / image_h)
+    elif fitting == "crop":
+        scale_ratio = np.full_like(w, scale)
+
+    crop_width = np.minimum(w / scale_ratio, image_w)
+    crop_height = np.minimum(h / scale_ratio, image_h)
+    crop_x = (image_w - crop_width) * factor_x
+    crop_y = (image_h - crop_height) * factor_y
+    # np.round rounds half to even, as round() does for a single box
+    pixel_boxes = np.round(np.stack([crop_x, crop_y, crop_x + crop_width, crop_y + crop_height], axis=-1))
+
+    offset_x = x + (w - (pixel_boxes[:, 2] - pixel_boxes[:, 0]) * scale_ratio) * factor_x
+    offset_y = y + (h - (pixel_boxes[:, 3] - pixel_boxes[:, 1]) * scale_ratio) * factor_y
+    placed_boxes = np.stack([offset_x, offset_y, crop_width * scale_ratio, crop_height * scale_ratio], axis=-1)
+    return placed_boxes, pixel_boxes.astype(int)
+
+
+imageBoxLayouts = image_box_layouts
+
+
+def _get_image_box_layout(
+    image_size: tuple[float, float],
+    box: Box,
+    fitting: ImageFitting,
+    scale: float,
+    anchor: ImageAnchor,
+) -> tuple[Box, PixelBox, float]:
+    """
+    the placed box, the crop box in pixels and the scale ratio of the image
+    """
+    assert fitting in {"fit", "fill", "crop"}, f"`fitting` value not admitted: {fitting}"
+
+    x, y, w, h = box
+
+    # get the scale ratio
+    image_w, image_h = image_size
+    scale_ratio_w = w / image_w
+    scale_ratio_h = h / image_h
+    if fitting == "fit":
+        scale_ratio = min(scale_ratio_w, scale_ratio_h)
+    elif fitting == "fill":
+        scale_ratio = max(scale_ratio_w, scale_ratio_h)
+    elif fitting == "crop":
+        scale_ratio = scale
+
+    pixel_box, crop_width, crop_height = _get_crop_box_with_anchor(
+        (image_w, image_h),
+        anchor,
+        w / scale_ratio,
+        h / scale_ratio,
+    )
+
+    x_min, y_min, x_max, y_max = pixel_box
+    factor_x, factor_y = _get_anchor_factors(anchor)
+    offset_x = x + (w - (x_max - x_min) * scale_ratio) * factor_x
+    offset_y = y + (h - (y_max - y_min) * scale_ratio) * factor_y
+
+    placed_box = offset_x, offset_y, crop_width * scale_ratio, crop_height * scale_ratio
+    return placed_box, pixel_box, scale_ratio
+
+
+class ImageBoxesPrefetch:
+    """
+    Prepares the images of several image_box calls in a thread pool, starting as soon as it is created.
+    Each item of boxes is a dict of image_box arguments.
+
+    Cropping, resampling and encoding run in the background while the rest of the page is built,
+    draw() then places the images in order and returns the same boxes image_box would.
+
+    ```
+    prefetch = ImageBoxesPrefetch([
+        {"path": "a.jpg", "box": (0, 0, 100, 100), "fitting": "fill"},
+        {"path": "b.jpg", "box": (110, 0, 100, 100), "anchor": ("center", "center")},
+    ])
+    ...
+    boxes = prefetch.draw()
+    ```
+    """
+
+    def __init__(self, boxes: Sequence[dict[str, Any]], max_workers: int | None = None) -> None:
+        self.boxes = [dict(arguments) for arguments in boxes]
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._placements = [
+            # in a copy of the current context, so the preparations are traced and counted as the caller's
+            executor.submit(copy_context().run, _prepare_image_box, **_split_image_box_arguments(arguments)[0])
+            for arguments in self.boxes
+        ]
+        # the submitted jobs keep running, draw() waits for them
+        executor.shutdown(wait=False)
+
+    def draw(self) -> list[Box]:
+        placed_boxes = []
+        for placement, arguments in zip(self._placements, self.boxes):
+            _, place_arguments = _split_image_box_arguments(arguments)
+            placed_boxes.append(_place_image_box(placement.result(), **place_arguments))
+        return placed_boxes
+
+
+@instrumented
+def image_boxes(boxes: Sequence[dict[str, Any]], max_workers: int | None = None) -> list[Box]:
+    """
+    Same as calling image_box with each item of boxes, a dict of image_box arguments,
+    with the images prepared in parallel before being placed in order.
+    """
+    return ImageBoxesPrefetch(boxes, max_workers=max_workers).draw()
+
+
+imageBoxes = image_boxes
+
+_PREPARE_ARGUMENTS = {"path", "box", "fitting", "scale", "anchor", "target_dpi"}
+
+
+def _split_image_box_arguments(arguments: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    prepare_arguments = {key: value for key, value in arguments.items() if key in _PREPARE_ARGUMENTS}
+    place_arguments = {key: value for key, value in arguments.items() if key not in _PREPARE_ARGUMENTS}
+    place_arguments["box"] = arguments["box"]
+    return prepare_arguments, place_arguments
+
+
+def set_image_target_dpi(dpi: float | None) -> None:
+    """
+    default resolution images placed by image_box are resampled to, None to keep all the pixels
+    """
+    global _default_target_dpi
+    _default_target_dpi = dpi
+
+
+imageTargetDPI = set_image_target_dpi
+
+
+def _get_target_pixel_size(
+    pixel_size: tuple[int, int], placed_size: tuple[float, float], target_dpi: float | None
+) -> tuple[int, int] | None:
+    """
+    the pixel size needed to place an image at the target resolution,
+    or None if the image doesn't have more pixels than that
+    """
+    if target_dpi is None:
+        return None
+    pixel_width, pixel_height = pixel_size
+    placed_width, placed_height = placed_size
+    target_width = max(1, math.ceil(abs(placed_width) / 72 * target_dpi))
+    target_height = max(1, math.ceil(abs(placed_height) / 72 * target_dpi))
+    if target_width >= pixel_width and target_height >= pixel_height:
+        return None
+    return min(target_width, pixel_width), min(target_height, pixel_height)
+
+
+def _cropped_image_source(path: SomePath, pixel_box: PixelBox, size: tuple[int, int] | None = None) -> AppKit.NSImage:
+    def encode() -> tuple[AppKit.NSImage, bytes]:
+        im = _crop_image(path, pixel_box)
+        if size is not None:
+            with span("image_box.resample", size=size):
+                im = im.resize(size, Image.Resampling.LANCZOS)
+        with span("image_box.encode"):
+            return _in_memory_image(im, Path(path).suffix)
+
+    nsimage, _ = _cached("encoded", path, encode, pixel_box, size)
+    return nsimage
+
+
+def _in_memory_image(im: Image.Image, suffix: str) -> tuple[AppKit.NSImage, bytes]:
+    """
+    encodes a PIL image in memory, in the format matching the file suffix, as an NSImage that drawBot can place
+    """
+    buffer = io.BytesIO()
+    im.save(buffer, format=Image.registered_extensions().get(suffix.lower(), "PNG"))
+    data = buffer.getvalue()
+    return AppKit.NSImage.alloc().initWithData_(AppKit.NSData.dataWithBytes_length_(data, len(data))), data
+
+
+def _crop_image(path: SomePath, pixel_box: PixelBox) -> Image.Image:
     ## moving through PIL here
     ## as drawBot imageObject.crop
     ## seems to produce blurred borders
-    crop_x = min(crop_x, im_width)
-    crop_y = min(crop_y, im_height)
-    im = Image.open(input_path)
-    im = im.crop((crop_x, crop_y, crop_x + crop_width, crop_y + crop_height))
-    im.save(output_path)
-    return crop_width, crop_height
+    def crop() -> Image.Image:
+        with span("image_box.crop", pixel_box=pixel_box):
+            return _decoded_image(path).crop(pixel_box)
+
+    return _cached("crop", path, crop, pixel_box)
+
+
+# where the anchor sits along the free space of each axis
+_ANCHOR_X_FACTORS = {"left": 0, "center": 0.5, "right": 1}
+_ANCHOR_Y_FACTORS = {"bottom": 0, "center": 0.5, "top": 1}
+
+
+def _get_anchor_factors(anchor: ImageAnchor) -> tuple[float, float]:
+    anchor_x, anchor_y = anchor
+    if anchor_x not in _ANCHOR_X_FACTORS:
+        raise ValueError(f"`anchor_x` value not admitted: {anchor_x}")
+    if anchor_y not in _ANCHOR_Y_FACTORS:
+        raise ValueError(f"`anchor_y` value not admitted: {anchor_y}")
+    return _ANCHOR_X_FACTORS[anchor_x], _ANCHOR_Y_FACTORS[anchor_y]
+
+
+def _get_crop_box_with_anchor(
+    image_size: tuple[float, float],
+    anchor: ImageAnchor,
+    crop_width: float,
+    crop_height: float,
+) -> tuple[PixelBox, float, float]:
+    """
+    returns the crop box in whole pixels, rounded the same way PIL does, and the crop dimensions
+    """
+    factor_x, factor_y = _get_anchor_factors(anchor)
+    im_width, im_height = image_size
+
+    crop_width = min(crop_width, im_width)
+    crop_height = min(crop_height, im_height)
+    crop_x = (im_width - crop_width) * factor_x
+    crop_y = (im_height - crop_height) * factor_y
+
+    x_min, y_min, x_max, y_max = (round(value) for value in (crop_x, crop_y, crop_x + crop_width, crop_y + crop_height))
+    return (x_min, y_min, x_max, y_max), crop_width, crop_height
 
 
 imageBox = image_box
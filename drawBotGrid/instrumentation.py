@@ -0,0 +1,252 @@
+"""
+Opt-in counters for the calls drawBotGrid functions and DrawBot primitives get while building pages,
+and trace events of the layout phases, readable by chrome://tracing or Perfetto.
+
+```
+with stats() as page_stats:
+    newPage()
+    columnTextBox(txt, box, grid)
+print(page_stats.report(per_page=True))
+
+with trace("layout.json"):
+    renderDocument(pages, "catalog.pdf")
+```
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, ContextManager, TypeAlias, TypeVar
+
+import drawBot as db
+from drawBot.aliases import SomePath
+
+# DrawBot functions counted while stats are collected
+PRIMITIVES = (
+    "textBox",
+    "textBoxBaselines",
+    "textOverflow",
+    "textSize",
+    "imageSize",
+    "image",
+    "savedState",
+)
+
+Function = TypeVar("Function", bound=Callable[..., Any])
+
+TraceEvent: TypeAlias = dict[str, Any]
+
+_active_stats: ContextVar["Stats | None"] = ContextVar("active_stats", default=None)
+_active_tracer: ContextVar["Tracer | None"] = ContextVar("active_tracer", default=None)
+_no_span = contextlib.nullcontext()
+_original_primitives: dict[str, Callable[..., Any]] = {}
+_collecting = 0
+
+
+class Stats:
+    """
+    Number of calls and accumulated wall time of each function, per page.
+    Times are inclusive: a drawBotGrid function time includes the primitives it calls.
+    """
+
+    def __init__(self) -> None:
+        # page number -> function name -> [calls, seconds]
+        self.pages: dict[int, dict[str, list[float]]] = {}
+        # image_box prefetch threads record into the same stats
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        page = db.pageCount()
+        with self._lock:
+            entry = self.pages.setdefault(page, {}).setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def totals(self) -> dict[str, tuple[int, float]]:
+        totals: dict[str, list[float]] = {}
+        for page_counts in self._snapshot().values():
+            for name, (calls, seconds) in page_counts.items():
+                entry = totals.setdefault(name, [0, 0.0])
+                entry[0] += calls
+                entry[1] += seconds
+        return {name: (int(calls), seconds) for name, (calls, seconds) in totals.items()}
+
+    def _snapshot(self) -> dict[int, dict[str, tuple[int, float]]]:
+        with self._lock:
+            return {
+                page: {name: (int(calls), seconds) for name, (calls, seconds) in page_counts.items()}
+                for page, page_counts in self.pages.items()
+            }
+
+    def calls(self, name: str) -> int:
+        return self.totals().get(name, (0, 0.0))[0]
+
+    def report(self, per_page: bool = False) -> str:
+        sections = [("all pages", self.totals())]
+        if per_page:
+            for page, page_counts in sorted(self._snapshot().items()):
+                sections.append((f"page {page}", page_counts))
+
+        lines = []
+        for title, counts in sections:
+            lines.append(title)
+            for name, (calls, seconds) in sorted(counts.items(), key=lambda item: -item[1][1]):
+                lines.append(f"    {name:<40} {calls:>8} calls {seconds * 1000:>12.3f} ms")
+        return "\n".join(lines)
+
+
+class StatsCollection:
+    """
+    Context manager collecting the calls made within it, see stats()
+    """
+
+    def __init__(self) -> None:
+        self.stats = Stats()
+
+    def __enter__(self) -> Stats:
+        self._token = _active_stats.set(self.stats)
+        _install_primitives()
+        return self.stats
+
+    def __exit__(self, *args: object) -> None:
+        _uninstall_primitives()
+        _active_stats.reset(self._token)
+
+
+def stats() -> StatsCollection:
+    """
+    Counts the calls and the wall time of drawBotGrid functions and DrawBot primitives within a with block.
+    The primitives are counted when called as attributes of the drawBot module, like drawBotGrid does,
+    or like db.textBox() in a script. Names imported with `from drawBot import textBox` are not counted.
+    """
+    return StatsCollection()
+
+
+class Tracer:
+    """
+    Collects trace events in the Chrome trace event format, see trace()
+    """
+
+    def __init__(self) -> None:
+        self.events: list[TraceEvent] = []
+
+    def add_span(self, name: str, start: float, end: float, args: dict[str, Any]) -> None:
+        self.events.append(
+            {
+                "name": name,
+                "cat": "drawBotGrid",
+                "ph": "X",
+                "ts": start * 1_000_000,
+                "dur": (end - start) * 1_000_000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def write(self, path: SomePath) -> None:
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+
+
+class TraceCollection:
+    """
+    Context manager collecting the trace events of the layout phases within it, see trace()
+    """
+
+    def __init__(self, path: SomePath | None = None) -> None:
+        self.path = path
+        self.tracer = Tracer()
+
+    def __enter__(self) -> Tracer:
+        self._token = _active_tracer.set(self.tracer)
+        return self.tracer
+
+    def __exit__(self, *args: object) -> None:
+        _active_tracer.reset(self._token)
+        if self.path is not None:
+            self.tracer.write(self.path)
+
+
+def trace(path: SomePath | None = None) -> TraceCollection:
+    """
+    Records begin and end of the layout phases (table measurement, column flow, text measurement and drawing,
+    image crop, encode and place) within a with block, and writes them to path as a Chrome trace JSON file.
+    Pages drawn by renderDocument in worker processes are traced too, and merged in the same file.
+    """
+    return TraceCollection(path)
+
+
+class _Span:
+    __slots__ = ("args", "name", "start", "tracer")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args: object) -> None:
+        self.tracer.add_span(self.name, self.start, time.perf_counter(), self.args)
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """
+    a traced phase, doing nothing unless a trace is being collected
+    """
+    tracer = _active_tracer.get()
+    if tracer is None:
+        return _no_span
+    return _Span(tracer, name, args)
+
+
+def current_tracer() -> Tracer | None:
+    return _active_tracer.get()
+
+
+def instrumented(function: Function) -> Function:
+    """
+    counts the calls of a drawBotGrid function while stats are collected
+    """
+    return _counted(function.__qualname__, function)
+
+
+def _install_primitives() -> None:
+    global _collecting
+    _collecting += 1
+    if _collecting > 1:
+        return
+    for name in PRIMITIVES:
+        _original_primitives[name] = getattr(db, name)
+        setattr(db, name, _counted(f"drawBot.{name}", _original_primitives[name]))
+
+
+def _uninstall_primitives() -> None:
+    global _collecting
+    _collecting -= 1
+    if _collecting > 0:
+        return
+    for name, primitive in _original_primitives.items():
+        setattr(db, name, primitive)
+    _original_primitives.clear()
+
+
+def _counted(name: str, function: Function) -> Function:
+    @functools.wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        current_stats = _active_stats.get()
+        if current_stats is None:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            current_stats.record(name, time.perf_counter() - start)
+
+    return wrapper  # type: ignore[return-value]
@@ -1,3 +1,7 @@
+import itertools
+from functools import cached_property
+from typing import Any, Iterable, Iterator
+
 import drawBot as db
 
 from . import text
@@ -9,9 +13,11 @@ from .aliases import (
     TableRow,
     TableRows,
 )
+from .instrumentation import instrumented, span
 
 
 class Table:
+    @instrumented
     def __init__(
         self,
         possize: Box,
@@ -20,11 +26,16 @@ class Table:
         base_row_height: float = 12,
         margins: float = 6,
         header_gap: float = 0,
+        row_heights: list[float] | None = None,
     ) -> None:
         self.x, self.y, self.width, self.input_height = possize
         self.margins = margins
+        self._items = list(items)
         self.columns_manager = ColumnsManager(self, column_descriptions)
-        self.rows_manager = RowsManager(self, items, base_row_height=base_row_height, header_gap=header_gap)
+        # row_heights, header included, skip measuring rows already measured
+        self.rows_manager = RowsManager(
+            self, self._items, base_row_height=base_row_height, header_gap=header_gap, row_heights=row_heights
+        )
         self.actual_height = self.rows_manager.total_height
         self.vertical_align = False
         self._show_header: bool = True
@@ -48,6 +59,7 @@ class Table:
         db.line((self.x, self.y), (self.x, self.y + self.height))
         db.line((self.x + self.width, self.y), (self.x + self.width, self.y + self.height))
 
+    @instrumented
     def draw_content(self) -> None:
         for contents, cells in zip(self.cell_values, self.cell_rects):
             for content, cell in zip(contents, cells):
@@ -70,12 +82,80 @@ class Table:
     def show_header(self, value: bool) -> None:
         self._show_header = value
         self.rows_manager.show_header = value
+        self.actual_height = self.rows_manager.total_height
+        self._invalidate_geometry()
+
+    @property
+    def items(self) -> TableData:
+        return self._items
+
+    @items.setter
+    def items(self, value: TableData) -> None:
+        self._items = list(value)
+        self._rebuild_rows()
+
+    @property
+    def column_descriptions(self) -> list[ColumnDescription]:
+        return self.columns_manager.column_descriptions
+
+    @column_descriptions.setter
+    def column_descriptions(self, value: list[ColumnDescription]) -> None:
+        self.columns_manager = ColumnsManager(self, value)
+        # the columns widths change the rows heights
+        self._rebuild_rows()
+
+    def append_row(self, item: TableItem) -> None:
+        self.insert_row(len(self._items), item)
+
+    def insert_row(self, index: int, item: TableItem) -> None:
+        """
+        inserts an item before index, only the new row is measured
+        """
+        self._items.insert(index, item)
+        self.rows_manager.insert_row(index, self.columns_manager.filter_row_content(item))
+        self._rows_changed()
+
+    def update_row(self, index: int, item: TableItem) -> None:
+        """
+        replaces the item at index, only its row is measured again
+        """
+        self._items[index] = item
+        self.rows_manager.update_row(index, self.columns_manager.filter_row_content(item))
+        self._rows_changed()
+
+    def delete_row(self, index: int) -> None:
+        del self._items[index]
+        self.rows_manager.delete_row(index)
+        self._rows_changed()
+
+    def _rows_changed(self) -> None:
+        self.actual_height = self.rows_manager.total_height
+        self._invalidate_geometry()
+
+    def _rebuild_rows(self) -> None:
+        self.rows_manager = RowsManager(
+            self,
+            self._items,
+            base_row_height=self.rows_manager.base_row_height,
+            header_gap=self.rows_manager.header_gap,
+        )
+        self.rows_manager.show_header = self.show_header
+        self.actual_height = self.rows_manager.total_height
+        self._invalidate_geometry()
+
+    def _invalidate_geometry(self) -> None:
+        """
+        cell_rects and the managers rects are computed once,
+        until the header is shown or hidden, or the items or the columns change
+        """
+        for owner in (self, self.columns_manager, self.rows_manager):
+            _clear_cached_properties(owner)
 
     @property
     def height(self) -> float:
         return -self.rows_manager.total_height
 
-    @property
+    @cached_property
     def cell_rects(self) -> list[list["CellBox"]]:
         out: list[list[CellBox]] = []
         for y, height in zip(self.rows_manager.origins, self.rows_manager.heights):
@@ -106,6 +186,78 @@ class Table:
         return self.rows_manager.content_rects
 
 
+def paginate_table(
+    possize: Box,
+    items: Iterable[TableItem],
+    column_descriptions: list[ColumnDescription],
+    base_row_height: float = 12,
+    margins: float = 6,
+    header_gap: float = 0,
+    batch_size: int = 256,
+) -> Iterator[Table]:
+    """
+    Splits the items into tables fitting the height of possize, repeating the header on each of them.
+
+    Items are consumed and measured batch_size at a time, so they can come from a generator,
+    and each table is yielded as soon as its page is full.
+
+    Rows are measured with the text state current when the iteration starts or resumes,
+    so it has to be the state the tables are drawn with. newPage() resets it, set it again after:
+
+    ```
+    def set_table_font():
+        font("Helvetica")
+        fontSize(9)
+
+    set_table_font()
+    for table in paginate_table((50, 800, 500, 750), read_price_list(), columns):
+        newPage()
+        set_table_font()
+        table.draw_content()
+    ```
+    """
+    template = Table(possize, [], column_descriptions, base_row_height, margins, header_gap)
+    header_height = template.rows_manager.row_heights[0]
+    available_height = template.input_height - header_height - header_gap
+
+    page_items: TableData = []
+    page_heights: list[float] = []
+    page_height = 0.0
+    items_iterator = iter(items)
+    while batch := list(itertools.islice(items_iterator, batch_size)):
+        rows = [template.columns_manager.filter_row_content(item) for item in batch]
+        for item, row_height in zip(batch, template.rows_manager._measure_rows_heights(rows)):
+            # a row taller than the page gets a page of its own
+            if page_items and page_height + row_height > available_height:
+                yield Table(
+                    possize,
+                    page_items,
+                    column_descriptions,
+                    base_row_height,
+                    margins,
+                    header_gap,
+                    row_heights=[header_height, *page_heights],
+                )
+                page_items, page_heights, page_height = [], [], 0.0
+            page_items.append(item)
+            page_heights.append(row_height)
+            page_height += row_height
+
+    if page_items:
+        yield Table(
+            possize,
+            page_items,
+            column_descriptions,
+            base_row_height,
+            margins,
+            header_gap,
+            row_heights=[header_height, *page_heights],
+        )
+
+
+paginateTable = paginate_table
+
+
 class ColumnsManager:
     WIDTH_KEY = "width"
     TITLE_KEY = "title"
@@ -118,7 +270,7 @@ class ColumnsManager:
         self.origins = self._calculate_columns_origins()
         self.titles = self._get_column_descriptions_filtered_key()
 
-    @property
+    @cached_property
     def rects(self) -> list[Box]:
         return [(x, self.table.y, w, self.table.height) for x, w in zip(self.origins, self.widths)]
 
@@ -164,13 +316,24 @@ class ColumnsManager:
 
 
 class RowsManager:
-    def __init__(self, parent: Table, rows: TableData, base_row_height: float = 12, header_gap: float = 0) -> None:
+    def __init__(
+        self,
+        parent: Table,
+        rows: TableData,
+        base_row_height: float = 12,
+        header_gap: float = 0,
+        row_heights: list[float] | None = None,
+    ) -> None:
         self.table = parent
         self.rows = [self.table.columns_manager.get_column_labels()] + self.filter_rows_content(rows)
         self.base_row_height = base_row_height
         self.header_gap = header_gap
         self._show_header = True
-        self.heights = self._calculate_rows_heights()
+        self.cells_count = 0
+        self.measurements_count = 0
+        # heights of all the rows, header included, measured once
+        self.row_heights = self._calculate_rows_heights() if row_heights is None else list(row_heights)
+        self.heights = self._get_shown_heights()
         self.origins = self._calculate_rows_origins()
 
     @property
@@ -180,10 +343,11 @@ class RowsManager:
     @show_header.setter
     def show_header(self, value: bool) -> None:
         self._show_header = value
-        self.heights = self._calculate_rows_heights()
+        self.heights = self._get_shown_heights()
         self.origins = self._calculate_rows_origins()
+        _clear_cached_properties(self)
 
-    @property
+    @cached_property
     def rects(self) -> list[Box]:
         return [(self.table.x, y, self.table.width, h) for y, h in zip(self.origins, self.heights)]
 
@@ -207,7 +371,7 @@ class RowsManager:
     def content_rect(self) -> Box:
         return (self.table.x, self.origins[-1], self.table.width, self.content_height)
 
-    @property
+    @cached_property
     def content_rects(self) -> list[Box]:
         return [(self.table.x, y, self.table.width, h) for y, h in zip(self.origins[1:], self.heights[1:])]
 
@@ -233,28 +397,121 @@ class RowsManager:
     def filter_rows_content(self, rows: TableData) -> TableRows:
         return [self.table.columns_manager.filter_row_content(row) for row in rows]
 
+    def measurement_info(self) -> dict[str, int]:
+        """
+        how many cells were measured, and how many measurements repeated contents saved
+        """
+        return {
+            "cells": self.cells_count,
+            "measured": self.measurements_count,
+            "saved": self.cells_count - self.measurements_count,
+        }
+
     def _calculate_rows_heights(self) -> list[float]:
-        heights: list[float] = []
+        return self._measure_rows_heights(self.rows)
+
+    def _get_shown_heights(self) -> list[float]:
         if self.show_header:
-            rows = self.rows
+            return list(self.row_heights)
         else:
-            rows = self.rows[1:]
-        for row in rows:
-            heights.append(self._calculate_row_height(row))
-        return heights
+            return self.row_heights[1:]
+
+    def _calculate_rows_origins(self) -> list[float]:
+        # rows go down from the top of the table, origins are their bottom edges
+        origins: list[float] = []
+        current_y = self.table.y
+        for index, height in enumerate(self.heights):
+            current_y -= height
+            origins.append(current_y)
+            if index == 0 and self.show_header:
+                current_y -= self.header_gap
+        return origins
+
+    def insert_row(self, index: int, row: TableRow) -> None:
+        """
+        index refers to the content rows, the header excluded
+        """
+        index, _, _ = slice(index, None).indices(len(self.content_values))
+        height = self._calculate_row_height(row)
+        self.rows.insert(index + 1, row)
+        self.row_heights.insert(index + 1, height)
+
+        position = self._get_shown_position(index)
+        if position == 0:
+            top = self.table.y
+        elif position == 1 and self.show_header:
+            top = self.origins[0] - self.header_gap
+        else:
+            top = self.origins[position - 1]
+        self.heights.insert(position, height)
+        self.origins.insert(position, top - height)
+        self._shift_origins(position + 1, height)
+        _clear_cached_properties(self)
+
+    def update_row(self, index: int, row: TableRow) -> None:
+        index = range(len(self.content_values))[index]
+        height = self._calculate_row_height(row)
+        delta = height - self.row_heights[index + 1]
+        self.rows[index + 1] = row
+        self.row_heights[index + 1] = height
+
+        position = self._get_shown_position(index)
+        self.heights[position] = height
+        self._shift_origins(position, delta)
+        _clear_cached_properties(self)
+
+    def delete_row(self, index: int) -> None:
+        index = range(len(self.content_values))[index]
+        del self.rows[index + 1]
+        height = self.row_heights.pop(index + 1)
+
+        position = self._get_shown_position(index)
+        del self.heights[position]
+        del self.origins[position]
+        self._shift_origins(position, -height)
+        _clear_cached_properties(self)
+
+    def _get_shown_position(self, index: int) -> int:
+        return index + 1 if self.show_header else index
+
+    def _shift_origins(self, start: int, delta: float) -> None:
+        """
+        moves down the origins from start on, as a row above them grew by delta
+        """
+        for position in range(start, len(self.origins)):
+            self.origins[position] -= delta
 
     def _calculate_row_height(self, row: TableRow) -> float:
+        return self._measure_rows_heights([row])[0]
+
+    def _measure_rows_heights(self, rows: TableRows) -> list[float]:
+        """
+        measures all the cells in a single saved state,
+        the same content in a column of the same width is measured once (units, currencies, empty cells...)
+        """
+        widths = self.table.columns_manager.widths
+        cell_heights: dict[tuple[str, float], float] = {}
         heights: list[float] = []
-        for content, width in zip(row, self.table.columns_manager.widths):
-            heights.append(self._calculate_cell_height(content, width))
-        return max(heights)
+        with span("Table.measure_rows", rows=len(rows)), db.savedState():
+            for row in rows:
+                row_heights: list[float] = []
+                for content, width in zip(row, widths):
+                    key = content, width
+                    if key not in cell_heights:
+                        cell_heights[key] = self._calculate_cell_height(content, width)
+                    row_heights.append(cell_heights[key])
+                heights.append(max(row_heights))
+                self.cells_count += len(row_heights)
+        self.measurements_count += len(cell_heights)
+        return heights
 
     def _calculate_cell_height(self, content: str, width: float) -> float:
-        with db.savedState():
-            return -db.textSize(content, width=width)[1] + self.table.margins * 2
+        return text._text_size(content, width=width)[1] + self.table.margins * 2
 
 
 class CellBox:
+    __slots__ = ("height", "table", "width", "x", "y")
+
     def __init__(self, parent: Table, possize: Box) -> None:
         self.table = parent
         self.x, self.y, self.width, self.height = possize
@@ -280,3 +537,9 @@ class CellBox:
             self.width - self.table.margins * 2,
             self.height,
         )
+
+
+def _clear_cached_properties(owner: Any) -> None:
+    for name, value in vars(type(owner)).items():
+        if isinstance(value, cached_property):
+            owner.__dict__.pop(name, None)
@@ -1,26 +1,188 @@
+import functools
 import math
-from typing import Callable
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Hashable, Self
 
 import drawBot as db
 from drawBot.aliases import RGBAColorTuple
 
 from .aliases import Box, HorizontalAlign, Point, VerticalAlign
 from .grid import BaselineGrid, ColumnGrid
+from .instrumentation import instrumented, span
 
-_textbox_funct: Callable = db.textBox
+_text_overflow_test_mode: ContextVar[bool] = ContextVar("text_overflow_test_mode", default=False)
 
 
-def set_text_overflow_test_mode(value: bool) -> None:
-    global _textbox_funct
-    if value is False:
-        _textbox_funct = db.textBox
-    else:
-        _textbox_funct = db.textOverflow
+class TextOverflowTestMode:
+    """
+    Returned by set_text_overflow_test_mode,
+    as a context manager it restores the previous mode on exit.
+
+    """
+
+    def __init__(self, value: bool) -> None:
+        self._token: Token[bool] = _text_overflow_test_mode.set(bool(value))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        _text_overflow_test_mode.reset(self._token)
+
+
+def set_text_overflow_test_mode(value: bool) -> TextOverflowTestMode:
+    """
+    In text overflow test mode, the textBox functions of this module return their overflow without drawing.
+
+    The mode is scoped to the current thread (or asyncio task),
+    so other threads can keep drawing while one measures.
+
+    ```
+    with textOverflowTestMode(True):
+        overflow = columnTextBox(txt, box)
+    ```
+    """
+    return TextOverflowTestMode(value)
 
 
 textOverflowTestMode = set_text_overflow_test_mode
 
 
+def _textbox_funct(txt: str, box: Box, align: HorizontalAlign | None = None) -> str:
+    if _text_overflow_test_mode.get():
+        return db.textOverflow(txt, box, align=align)
+    return db.textBox(txt, box, align=align)
+
+
+class MeasurementCache:
+    """
+    LRU cache for text measurements (textBoxBaselines, textSize...),
+    keyed by the measured text, the box and the current typographic state.
+
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, measure: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+
+        value = measure()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def count_miss(self) -> None:
+        """
+        a measurement that couldn't be cached
+        """
+        with self._lock:
+            self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._items), "maxsize": self.maxsize}
+
+
+measurement_cache = MeasurementCache()
+
+# FormattedString attributes that can change the layout of a text
+_TYPOGRAPHIC_ATTRIBUTES = (
+    "font",
+    "fallbackFont",
+    "fontSize",
+    "fontNumber",
+    "lineHeight",
+    "tracking",
+    "baselineShift",
+    "openTypeFeatures",
+    "fontVariations",
+    "fontVariationNamedInstance",
+    "language",
+    "writingDirection",
+    "tabs",
+    "indent",
+    "tailIndent",
+    "firstLineIndent",
+    "paragraphTopSpacing",
+    "paragraphBottomSpacing",
+)
+
+
+def _typographic_state_key() -> tuple | None:
+    """
+    a hashable snapshot of the current DrawBot text state,
+    or None if it can't be read, in which case measurements are not cached
+    """
+    try:
+        state = db._drawBotDrawingTool._dummyContext._state
+        text_state = state.text
+        return (
+            state.hyphenation,
+            *(repr(getattr(text_state, f"_{name}", None)) for name in _TYPOGRAPHIC_ATTRIBUTES),
+        )
+    except AttributeError:  # pragma: no cover
+        return None
+
+
+def _font_state_key() -> tuple[str, float] | None:
+    try:
+        text_state = db._drawBotDrawingTool._dummyContext._state.text
+        return repr(text_state._font), text_state._fontSize
+    except AttributeError:  # pragma: no cover
+        return None
+
+
+def _measure(funct: Callable, txt: Any, *args: Any) -> Any:
+    state_key = _typographic_state_key() if isinstance(txt, str) else None
+    if state_key is None:
+        measurement_cache.count_miss()
+        return funct(txt, *args)
+    key = (funct.__name__, txt, args, state_key)
+    return measurement_cache.get(key, lambda: funct(txt, *args))
+
+
+def _text_box_baselines(txt: str, box: Box, align: HorizontalAlign | None = None) -> list[tuple[float, float]]:
+    lines = _measure(_text_box_baselines_uncached, txt, tuple(box), align)
+    return list(lines)
+
+
+def _text_box_baselines_uncached(txt: str, box: Box, align: HorizontalAlign | None) -> tuple[tuple[float, float], ...]:
+    return tuple(db.textBoxBaselines(txt, box, align=align))
+
+
+def _text_size(txt: str, width: float | None = None) -> tuple[float, float]:
+    return _measure(_text_size_uncached, txt, width)
+
+
+def _text_size_uncached(txt: str, width: float | None) -> tuple[float, float]:
+    w, h = db.textSize(txt, width=width)
+    return w, h
+
+
+@instrumented
 def baseline_grid_textBox(
     txt: str,
     box: Box,
@@ -36,41 +198,62 @@ def baseline_grid_textBox(
         x, y, w, h = box
 
         if not align_first_line_only:
-            actual_line_height = db.fontLineHeight()
-            target_line_height = math.ceil(actual_line_height / baseline_grid.line_height) * baseline_grid.line_height
-            set_metric_baseline_height(target_line_height)
+            _set_baseline_grid_line_height(baseline_grid)
 
-        absolute_cap_height = db.fontCapHeight()
+        with span("baseline_grid_textBox.measure"):
+            shift = _get_baseline_grid_shift(txt, box, baseline_grid, vertical_align)
+        with span("baseline_grid_textBox.draw"):
+            overflow = _textbox_funct(txt, (x, y + shift, w, h), align=align)
+        return overflow
 
-        if vertical_align == "top":
-            first_line_y = db.textBoxBaselines(txt, box)[0][1]
-            current_cap_y = first_line_y + absolute_cap_height
-            cap_distance_from_top = y + h - current_cap_y
 
-            highest_possible_first_line = first_line_y + cap_distance_from_top
-            target_line = baseline_grid.closest_line_below_coordinate(highest_possible_first_line)
+baselineGridTextBox = baseline_grid_textBox
 
-            shift = target_line - first_line_y if target_line is not None else 0
 
-        elif vertical_align == "bottom":
-            last_line_y = db.textBoxBaselines(txt, box)[-1][1]
-            target_line = baseline_grid.closest_line_above_coordinate(y)
-            shift = target_line - last_line_y if target_line is not None else 0
+def _set_baseline_grid_line_height(baseline_grid: BaselineGrid) -> None:
+    actual_line_height = db.fontLineHeight()
+    target_line_height = math.ceil(actual_line_height / baseline_grid.line_height) * baseline_grid.line_height
+    set_metric_baseline_height(target_line_height)
 
-        elif vertical_align == "center":
-            lines = db.textBoxBaselines(txt, box)
-            mid_line_index = int(len(lines) / 2)
-            mid_line_y = lines[mid_line_index][1]
-            target_line = baseline_grid.closest_line_below_coordinate(y + h / 2 - absolute_cap_height / 2)
-            shift = target_line - mid_line_y if target_line is not None else 0
 
-        overflow = _textbox_funct(txt, (x, y + shift, w, h), align=align)
-        return overflow
+def _get_baseline_grid_shift(
+    txt: str,
+    box: Box,
+    baseline_grid: BaselineGrid,
+    vertical_align: VerticalAlign,
+) -> float:
+    """
+    the vertical shift snapping the text to the baseline grid, box is expected to be direction corrected
+    """
+    _, y, _, h = box
+    absolute_cap_height = db.fontCapHeight()
 
+    if vertical_align == "top":
+        first_line_y = _text_box_baselines(txt, box)[0][1]
+        current_cap_y = first_line_y + absolute_cap_height
+        cap_distance_from_top = y + h - current_cap_y
 
-baselineGridTextBox = baseline_grid_textBox
+        highest_possible_first_line = first_line_y + cap_distance_from_top
+        target_line = baseline_grid.closest_line_below_coordinate(highest_possible_first_line)
+
+        shift = target_line - first_line_y if target_line is not None else 0
+
+    elif vertical_align == "bottom":
+        last_line_y = _text_box_baselines(txt, box)[-1][1]
+        target_line = baseline_grid.closest_line_above_coordinate(y)
+        shift = target_line - last_line_y if target_line is not None else 0
+
+    elif vertical_align == "center":
+        lines = _text_box_baselines(txt, box)
+        mid_line_index = int(len(lines) / 2)
+        mid_line_y = lines[mid_line_index][1]
+        target_line = baseline_grid.closest_line_below_coordinate(y + h / 2 - absolute_cap_height / 2)
+        shift = target_line - mid_line_y if target_line is not None else 0
+
+    return shift
 
 
+@instrumented
 def column_textBox(
     txt: str,
     box: Box,
@@ -94,6 +277,7 @@ def column_textBox(
 columnTextBox = column_textBox
 
 
+@instrumented
 def column_baseline_grid_textBox(
     txt: str,
     box: Box,
@@ -130,14 +314,15 @@ def _column_textBox_base(
     draw_grid: bool = False,
 ) -> str:
     columns = ColumnGrid(box, subdivisions=subdivisions, gutter=gutter)
-    overflow = txt
-    for col in columns:
-        if len(overflow) > 0:
-            sub_box = (col, columns.bottom, columns * 1, columns.height)
-            if baseline_grid:
-                overflow = baseline_grid_textBox(overflow, sub_box, baseline_grid, align=align)
-            else:
-                overflow = _textbox_funct(overflow, sub_box, align=align)
+    if baseline_grid:
+        overflow = _flow_baseline_grid_columns(txt, columns, baseline_grid, align=align)
+    else:
+        overflow = txt
+        for index, col in enumerate(columns):
+            if len(overflow) > 0:
+                sub_box = (col, columns.bottom, columns * 1, columns.height)
+                with span("column_textBox.column", column=index):
+                    overflow = _textbox_funct(overflow, sub_box, align=align)
 
     if draw_grid:
         grid_color: RGBAColorTuple = (0.5, 0, 0.8, 1)
@@ -170,6 +355,36 @@ def _column_textBox_base(
     return overflow
 
 
+def _flow_baseline_grid_columns(
+    txt: str,
+    columns: ColumnGrid,
+    baseline_grid: BaselineGrid,
+    align: HorizontalAlign = "left",
+) -> str:
+    """
+    Flows the text through the columns, snapped to the baseline grid.
+
+    All the columns share the same top and height, so for a plain string set in a single style
+    the first baseline lands at the same height in every column: the baseline grid shift is measured
+    once and reused, each column is then typeset only once, when it is drawn.
+    A FormattedString may change style from one column to the next, so it is measured per column.
+    """
+    overflow = txt
+    with db.savedState():
+        _set_baseline_grid_line_height(baseline_grid)
+        shift = None
+        for index, col in enumerate(columns):
+            if len(overflow) == 0:
+                break
+            x, y, w, h = correct_box_direction((col, columns.bottom, columns * 1, columns.height))
+            with span("column_textBox.column", column=index):
+                if shift is None or not isinstance(overflow, str):
+                    with span("baseline_grid_textBox.measure"):
+                        shift = _get_baseline_grid_shift(overflow, (x, y, w, h), baseline_grid, "top")
+                overflow = _textbox_funct(overflow, (x, y + shift, w, h), align=align)
+    return overflow
+
+
 def _get_text_flow_path(xy1: Point, xy2: Point) -> db.BezierPath:
     x_1, y_1 = xy1
     x_2, y_2 = xy2
@@ -185,6 +400,7 @@ def _draw_point(xy: Point, radius: float = 2) -> None:
     db.oval(x - radius, y - radius, radius * 2, radius * 2)
 
 
+@instrumented
 def vertical_align_textBox(
     txt: str, box: Box, align: HorizontalAlign | None = None, vertical_align: VerticalAlign = "top"
 ) -> str:
@@ -195,18 +411,18 @@ def vertical_align_textBox(
     absolute_cap_height = db.fontCapHeight()
 
     if vertical_align == "top":
-        first_line_y = db.textBoxBaselines(txt, box)[0][1]
+        first_line_y = _text_box_baselines(txt, box)[0][1]
         target_line = y + h - absolute_cap_height
         shift = target_line - first_line_y
 
     elif vertical_align == "bottom":
-        last_line_y = db.textBoxBaselines(txt, box)[-1][1]
+        last_line_y = _text_box_baselines(txt, box)[-1][1]
         target_line = y
         shift = target_line - last_line_y
 
     elif vertical_align == "center":
         # maybe there is more refined solution here
-        lines = db.textBoxBaselines(txt, box)
+        lines = _text_box_baselines(txt, box)
 
         top = lines[0][1] + absolute_cap_height
         bottom = lines[-1][1]
@@ -222,6 +438,113 @@ def vertical_align_textBox(
 verticalAlignTextBox = vertical_align_textBox
 
 
+@instrumented
+def fit_text_to_box(
+    txt: str,
+    box: Box,
+    max_font_size: float,
+    min_font_size: float = 1,
+    baseline_grid: BaselineGrid | None = None,
+    align: HorizontalAlign = "left",
+    line_height_ratio: float | None = None,
+    tracking: float | None = None,
+    tolerance: float = 0.1,
+) -> tuple[float, str]:
+    """
+    Finds the largest font size, within tolerance, at which the text fits in the box, without drawing anything.
+    Returns that font size and the overflow at that size, which is only non-empty if even min_font_size overflows.
+
+    If line_height_ratio is given, the line height follows the font size.
+    It can't be combined with a baseline_grid, which sets the line height itself.
+    """
+    _check_line_height_arguments(baseline_grid, line_height_ratio)
+
+    def get_overflow() -> str:
+        if baseline_grid:
+            with set_text_overflow_test_mode(True):
+                return baseline_grid_textBox(txt, box, baseline_grid, align=align)
+        return db.textOverflow(txt, box, align=align)
+
+    return _fit_font_size(get_overflow, max_font_size, min_font_size, line_height_ratio, tracking, tolerance)
+
+
+fitTextToBox = fit_text_to_box
+
+
+@instrumented
+def fit_column_text(
+    txt: str,
+    box: Box,
+    max_font_size: float,
+    min_font_size: float = 1,
+    subdivisions: int = 2,
+    gutter: float = 10,
+    baseline_grid: BaselineGrid | None = None,
+    align: HorizontalAlign = "left",
+    line_height_ratio: float | None = None,
+    tracking: float | None = None,
+    tolerance: float = 0.1,
+) -> tuple[float, str]:
+    """
+    Same as fit_text_to_box, for text flowing through columns as with column_textBox
+    or, if a baseline_grid is given, column_baseline_grid_textBox.
+    """
+    _check_line_height_arguments(baseline_grid, line_height_ratio)
+
+    def get_overflow() -> str:
+        with set_text_overflow_test_mode(True):
+            return _column_textBox_base(txt, box, baseline_grid, subdivisions=subdivisions, gutter=gutter, align=align)
+
+    return _fit_font_size(get_overflow, max_font_size, min_font_size, line_height_ratio, tracking, tolerance)
+
+
+fitColumnText = fit_column_text
+
+
+def _check_line_height_arguments(baseline_grid: BaselineGrid | None, line_height_ratio: float | None) -> None:
+    if baseline_grid is not None and line_height_ratio is not None:
+        raise ValueError(
+            "`line_height_ratio` can't be used with `baseline_grid`, the baseline grid sets the line height"
+        )
+
+
+def _fit_font_size(
+    get_overflow: Callable[[], str],
+    max_font_size: float,
+    min_font_size: float,
+    line_height_ratio: float | None,
+    tracking: float | None,
+    tolerance: float,
+) -> tuple[float, str]:
+    # bisection over the font size, assuming the overflow only grows with it
+    overflows: dict[float, str] = {}
+
+    def overflow_at(font_size: float) -> str:
+        if font_size not in overflows:
+            with db.savedState():
+                db.fontSize(font_size)
+                if line_height_ratio is not None:
+                    db.lineHeight(font_size * line_height_ratio)
+                if tracking is not None:
+                    db.tracking(tracking)
+                overflows[font_size] = get_overflow()
+        return overflows[font_size]
+
+    if not overflow_at(max_font_size):
+        return max_font_size, ""
+    if overflow_at(min_font_size):
+        return min_font_size, overflow_at(min_font_size)
+
+    low, high = min_font_size, max_font_size
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        if overflow_at(middle):
+            high = middle
+        else:
+            low = middle
+    return low, overflow_at(low)
+
+
 def set_metric_baseline_height(baseline_height: float) -> float:
     # this seems to be necessary only for fonts with unusual vertical metrics
     line_height = _get_line_height_from_desired_baseline_height(baseline_height)
@@ -232,11 +555,37 @@ def set_metric_baseline_height(baseline_height: float) -> float:
 baselineHeight = set_metric_baseline_height
 
 
+def clear_metrics_cache() -> None:
+    """
+    forget the line heights computed by set_metric_baseline_height and the cached text measurements,
+    only needed if a font file changes on disk while the same name is in use
+    """
+    _get_cached_line_height_from_desired_baseline_height.cache_clear()
+    measurement_cache.clear()
+
+
+clearMetricsCache = clear_metrics_cache
+
+
 def _get_line_height_from_desired_baseline_height(baseline_height: float) -> float:
+    font_key = _font_state_key()
+    if font_key is None:  # pragma: no cover
+        return _measure_line_height_from_desired_baseline_height(baseline_height)
+    return _get_cached_line_height_from_desired_baseline_height(*font_key, baseline_height)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_cached_line_height_from_desired_baseline_height(font: str, font_size: float, baseline_height: float) -> float:
+    # font and font_size are only part of the cache key, the measurement uses the current state
+    return _measure_line_height_from_desired_baseline_height(baseline_height)
+
+
+def _measure_line_height_from_desired_baseline_height(baseline_height: float) -> float:
     with db.savedState():
         txt = "H\nH"
         db.lineHeight(baseline_height)
         # should calculate appropriate size here
+        # not through measurement_cache, the result is already memoized by font
         lines = db.textBoxBaselines(txt, (0, 0, 10000, 10000))
         line_dist = lines[0][1] - lines[1][1]
         target_line_dist = baseline_height
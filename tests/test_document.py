@@ -0,0 +1,61 @@
+import functools
+
+import drawBot as db
+import pytest
+
+from drawBotGrid.document import _split_pages, render_document
+from drawBotGrid.grid import ColumnGrid
+
+
+def _draw_page() -> None:
+    db.newPage(200, 200)
+    ColumnGrid((10, 10, 180, 180), 4).draw()
+
+
+def _draw_numbered_page(index: int) -> None:
+    db.newPage(200 + index, 200)
+    db.text(f"page {index}", (20, 20))
+
+
+def _pdf_pages(path) -> list[tuple[str, float]]:
+    """
+    text and width of each page of a PDF
+    """
+    import AppKit
+    import Quartz
+
+    document = Quartz.PDFDocument.alloc().initWithURL_(AppKit.NSURL.fileURLWithPath_(str(path)))
+    pages = []
+    for page_index in range(document.pageCount()):
+        page = document.pageAtIndex_(page_index)
+        pages.append((page.string().strip(), page.boundsForBox_(Quartz.kPDFDisplayBoxMediaBox).size.width))
+    return pages
+
+
+def test_split_pages() -> None:
+    pages = list(range(10))
+    chunks = _split_pages(pages, 3)  # type: ignore
+    assert chunks == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+
+def test_render_document_serial(tmp_path) -> None:
+    path = tmp_path / "document.pdf"
+    render_document([_draw_page] * 3, path, max_workers=1)
+    assert db.numberOfPages(path) == 3
+
+
+def test_render_document_parallel(tmp_path) -> None:
+    pages = [functools.partial(_draw_numbered_page, index) for index in range(7)]
+    serial_path = tmp_path / "serial.pdf"
+    parallel_path = tmp_path / "parallel.pdf"
+    render_document(pages, serial_path, max_workers=1)
+    render_document(pages, parallel_path, max_workers=2)
+
+    assert db.numberOfPages(parallel_path) == 7
+    assert _pdf_pages(parallel_path) == _pdf_pages(serial_path)
+    assert _pdf_pages(parallel_path) == [(f"page {index}", 200 + index) for index in range(7)]
+
+
+def test_render_document_needs_pages(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        render_document([], tmp_path / "document.pdf")
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+from drawBotGrid import geometry, grid
+
+
+def test_geometry_without_drawBot() -> None:
+    script = (
+        "import sys\n"
+        "from drawBotGrid.geometry import ColumnGrid\n"
+        "columns = ColumnGrid.from_margins((-50, -50, -50, -50), 8, 10, page_size=(1000, 1000))\n"
+        "print(columns[3], 'drawBot' in sys.modules)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["391.25", "False"]
+
+
+@pytest.mark.parametrize(
+    "geometry_class, grid_class, arguments",
+    [
+        (geometry.ColumnGrid, grid.ColumnGrid, (7, 12)),
+        (geometry.RowGrid, grid.RowGrid, (5, 3)),
+        (geometry.Grid, grid.Grid, (4, 6, 10, 5)),
+        (geometry.BaselineGrid, grid.BaselineGrid, (13,)),
+    ],
+)
+def test_geometry_matches_grid(geometry_class, grid_class, arguments) -> None:
+    possize = (40, 30, 920, 850)
+    assert list(geometry_class(possize, *arguments)) == list(grid_class(possize, *arguments))
+    assert issubclass(grid_class, geometry_class)
+
+
+def test_grid_columns_are_drawable() -> None:
+    my_grid = grid.Grid((40, 30, 920, 850))
+    assert isinstance(my_grid.columns, grid.ColumnGrid)
+    assert not isinstance(geometry.Grid((40, 30, 920, 850)).columns, grid.ColumnGrid)
@@ -158,3 +158,96 @@ def test_baseline_grid_iter(baseline_grid: BaselineGrid) -> None:
     for i, _ in enumerate(baseline_grid):
         pass
     assert i == 20  # 21-1
+
+
+@pytest.mark.parametrize("y_coordinate", [-5, 0, 0.5, 99.999, 100, 105, 199.5, 200, 200.5, 250])
+def test_baseline_grid_lookups_match_linear_scan(baseline_grid: BaselineGrid, y_coordinate: float) -> None:
+    lines = list(baseline_grid)
+    below = next((i for i, line in enumerate(lines) if y_coordinate >= line), None)
+    above = next((i for i, line in enumerate(lines) if y_coordinate > line), None)
+    assert baseline_grid.baseline_index_from_coordinate(y_coordinate) == below
+    assert baseline_grid.closest_line_below_coordinate(y_coordinate) == (lines[below] if below is not None else None)
+    assert baseline_grid.closest_line_above_coordinate(y_coordinate) == (
+        lines[above] + baseline_grid.line_height if above is not None else None
+    )
+
+
+def test_baseline_grid_batch_lookups(baseline_grid: BaselineGrid) -> None:
+    y_coordinates = [-5, 0, 105, 200, 250]
+    assert baseline_grid.closest_lines_below_coordinates(y_coordinates) == [None, 0, 100, 200, 200]
+    assert baseline_grid.closest_lines_above_coordinates(y_coordinates) == [None, None, 110, 200, 210]
+
+
+def test_gutter_grid_positions() -> None:
+    columns = ColumnGrid((10, 20, 100, 200), subdivisions=4, gutter=5)
+    rows = RowGrid((10, 20, 100, 200), subdivisions=3, gutter=5)
+    assert columns.positions() == [columns[i] for i in range(len(columns))]
+    assert rows.positions() == [rows[i] for i in range(len(rows))]
+
+
+def test_grid_positions(grid: Grid) -> None:
+    positions = grid.cell_positions()
+    assert len(positions) == len(grid)
+    assert positions[0] == grid[0, 0]
+    assert positions[1] == grid[1, 0]
+    assert positions[4] == grid[0, 1]
+
+
+def test_baseline_grid_positions(baseline_grid: BaselineGrid) -> None:
+    assert baseline_grid.positions() == [baseline_grid[i] for i in range(len(baseline_grid))]
+
+
+def test_as_array(grid: Grid, baseline_grid: BaselineGrid) -> None:
+    np = pytest.importorskip("numpy")
+    assert np.allclose(grid.columns.as_array(), grid.columns.positions())
+    assert np.allclose(baseline_grid.as_array(), baseline_grid.positions())
+    mesh = grid.cells_as_array()
+    assert not isinstance(mesh, list)
+    assert mesh.shape == (4, 4, 2)
+    assert tuple(mesh[2, 1]) == pytest.approx(grid[1, 2])
+
+
+def test_geometry_is_invalidated_on_change() -> None:
+    columns = ColumnGrid((0, 0, 100, 100), subdivisions=4, gutter=5)
+    assert columns.column_width == 21.25
+    assert columns[-1] == 100
+    columns.gutter = 0
+    assert columns.column_width == 25
+    assert list(columns) == [0, 25, 50, 75]
+
+    baseline_grid = BaselineGrid((0, 0, 100, 200), line_height=10)
+    assert baseline_grid.bottom == 0
+    baseline_grid.line_height = 30
+    assert len(baseline_grid) == 7
+    assert baseline_grid.bottom == 20
+    assert baseline_grid.height == 180
+
+    with pytest.raises(AttributeError):
+        baseline_grid.top = 10  # type: ignore
+
+
+def test_draw_cached_paths() -> None:
+    with db.drawing():
+        db.newPage(1000, 1000)
+        grid = Grid((10, 20, 100, 200))
+        grid.draw(show_index=True, cache_path=True)
+        same_grid = Grid((10, 20, 100, 200))
+        assert same_grid._get_path("frame", cache_path=True) is grid._get_path("frame", cache_path=True)
+        assert same_grid._get_path("indexes", cache_path=True) is grid._get_path("indexes", cache_path=True)
+        other_grid = Grid((10, 20, 100, 200), column_gutter=5)
+        assert other_grid._get_path("frame", cache_path=True) is not grid._get_path("frame", cache_path=True)
+
+
+def test_draw_indexes_current_font(monkeypatch) -> None:
+    fonts = []
+    monkeypatch.setattr(db.BezierPath, "text", lambda self, txt, **kwargs: fonts.append(kwargs["font"]))
+    with db.drawing():
+        db.newPage(1000, 1000)
+        columns = ColumnGrid((10, 20, 100, 200), subdivisions=2)
+        db.font("Times")
+        times_path = columns._get_path("indexes", cache_path=True)
+        db.font("Courier")
+        courier_path = columns._get_path("indexes", cache_path=True)
+        assert columns._get_path("indexes", cache_path=True) is courier_path
+    assert times_path is not courier_path
+    assert fonts == ["Times", "Times", "Courier", "Courier"]
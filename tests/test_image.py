@@ -1,8 +1,23 @@
+import io
+
 import drawBot as db
 import pytest
+from PIL import Image
 
-from drawBotGrid.aliases import Box
-from drawBotGrid.image import imageAtSize, imageBox
+from drawBotGrid.aliases import Box, ImageAnchor, ImageFitting
+from drawBotGrid.image import (
+    ImageCache,
+    _decoded_image,
+    _get_target_pixel_size,
+    _image_size,
+    _is_transposed,
+    image_cache,
+    imageAtSize,
+    imageBox,
+    imageBoxes,
+    imageBoxLayout,
+    imageBoxLayouts,
+)
 
 boxes = [
     (100, 100, 300, 300),
@@ -70,3 +85,136 @@ def test_imageBox_exceptions(anchor) -> None:
                 fitting="crop",
                 anchor=anchor,
             )
+
+
+def test_image_cache_budget() -> None:
+    cache = ImageCache(max_bytes=100)
+    cache.get("a", lambda: Image.new("L", (5, 10)))
+    cache.get("b", lambda: Image.new("L", (5, 10)))
+    assert cache.total_bytes == 100
+    cache.get("a", lambda: Image.new("L", (5, 10)))
+    cache.get("c", lambda: Image.new("L", (5, 10)))
+    # "b" was the least recently used entry
+    assert cache.info() == {"hits": 1, "misses": 3, "size": 2, "bytes": 100, "max_bytes": 100}
+    cache.get("b", lambda: Image.new("L", (5, 10)))
+    assert cache.misses == 4
+
+
+def test_imageBox_uses_cache() -> None:
+    image_cache.clear()
+    with db.drawing():
+        db.newPage(1000, 1000)
+        for _ in range(2):
+            imageBox("drawBotGrid/docs/drawMech-small.jpg", (0, 0, 50, 50), fitting="crop", scale=0.3)
+    assert image_cache.misses == 4  # size, encoded, crop, decoded
+    assert image_cache.hits == 2  # size, encoded
+
+
+def test_imageBoxes_matches_imageBox() -> None:
+    boxes = [
+        {"path": "drawBotGrid/docs/drawMech-small.jpg", "box": (0, 0, 50, 50), "fitting": "fill"},
+        {"path": "drawBotGrid/docs/drawMech-small.jpg", "box": (60, 0, 50, 80), "anchor": ("center", "center")},
+        {"path": "drawBotGrid/docs/drawMech-small.jpg", "box": (0, 90, 50, 50), "fitting": "crop", "scale": 0.2},
+    ]
+    with db.drawing():
+        db.newPage(1000, 1000)
+        expected = [imageBox(**arguments) for arguments in boxes]
+        assert imageBoxes(boxes, max_workers=2) == expected
+
+
+@pytest.mark.parametrize("parameters", test_imageBox_parameters)
+def test_imageBoxLayout(parameters: dict) -> None:
+    placed_box, crop_box = imageBoxLayout(
+        _image_size("drawBotGrid/docs/drawMech-small.jpg"),
+        (0, 0, 107.0, 165.0),
+        scale=parameters["scale"],
+        fitting=parameters["fitting"],
+        anchor=parameters["anchor"],
+    )
+    assert placed_box == pytest.approx(parameters["result"])
+    assert all(isinstance(value, int) for value in crop_box)
+
+
+@pytest.mark.parametrize("fitting", ["fit", "fill", "crop"])
+@pytest.mark.parametrize("anchor", [("left", "top"), ("center", "center"), ("right", "bottom")])
+def test_imageBoxLayouts(fitting: ImageFitting, anchor: ImageAnchor) -> None:
+    image_sizes = [(400, 300), (300, 400), (1001, 999), (50, 50)]
+    boxes: list[Box] = [(0, 0, 100, 100), (10, 20, 30, 300), (5, 5, 333, 77), (0, 0, 200, 50)]
+    placed_boxes, crop_boxes = imageBoxLayouts(image_sizes, boxes, fitting=fitting, scale=0.4, anchor=anchor)
+    for image_size, box, placed_box, crop_box in zip(image_sizes, boxes, placed_boxes, crop_boxes):
+        expected_placed_box, expected_crop_box = imageBoxLayout(image_size, box, fitting, 0.4, anchor)
+        assert tuple(placed_box) == pytest.approx(expected_placed_box)
+        assert tuple(crop_box) == expected_crop_box
+
+
+def test_target_pixel_size() -> None:
+    assert _get_target_pixel_size((1000, 500), (100, 50), 144) == (200, 100)
+    assert _get_target_pixel_size((100, 50), (100, 50), 144) is None
+    assert _get_target_pixel_size((1000, 500), (100, 50), None) is None
+
+
+def _encoded_pixel_sizes() -> list[tuple[int, int]]:
+    """
+    pixel size of the images encoded for placement, read back from the cache
+    """
+    sizes = []
+    for _, data in image_cache.values("encoded"):
+        with Image.open(io.BytesIO(data)) as im:
+            sizes.append(im.size)
+    return sizes
+
+
+@pytest.mark.parametrize(
+    "target_dpi, pixel_size",
+    [
+        (None, (636, 636)),
+        # 50pt at 72dpi
+        (72, (50, 50)),
+        # 50pt at 1000dpi is 695px, more than the 636px crop: not upsampled
+        (1000, (636, 636)),
+    ],
+)
+def test_imageBox_target_dpi(target_dpi: float | None, pixel_size: tuple[int, int]) -> None:
+    image_cache.clear()
+    with db.drawing():
+        db.newPage(1000, 1000)
+        full = imageBox("drawBotGrid/docs/drawMech-small.jpg", (0, 0, 50, 50), fitting="fill")
+        image_cache.clear()
+        resampled = imageBox(
+            "drawBotGrid/docs/drawMech-small.jpg", (0, 0, 50, 50), fitting="fill", target_dpi=target_dpi
+        )
+    assert resampled == pytest.approx(full)
+    assert _encoded_pixel_sizes() == [pixel_size]
+
+
+def test_image_at_size_rotated(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90°
+    Image.new("RGB", (40, 30)).save(path, exif=exif)
+
+    scales = []
+    sources = []
+    monkeypatch.setattr(db, "scale", lambda *args: scales.append(args))
+    monkeypatch.setattr(db, "image", lambda source, position: sources.append(source))
+    image_cache.clear()
+    with db.drawing():
+        db.newPage(1000, 1000)
+        imageAtSize(path, (0, 0, 300, 0))
+
+    # scaled against the oriented width, 30px
+    assert scales == [(10, 10)]
+    # placed oriented, not the file pixels as stored
+    assert sources[0] != path
+    assert _encoded_pixel_sizes() == [(30, 40)]
+
+
+def test_image_size_probe(tmp_path) -> None:
+    path = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90°
+    Image.new("RGB", (20, 10)).save(path, exif=exif)
+    assert _image_size(path) == (10, 20)
+    assert _is_transposed(path)
+    assert _decoded_image(path).size == (10, 20)
+    assert _image_size("drawBotGrid/docs/drawMech-small.jpg") == db.imageSize("drawBotGrid/docs/drawMech-small.jpg")
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import drawBotGrid
+
+
+def test_lazy_imports() -> None:
+    script = (
+        "import sys\n"
+        "from drawBotGrid import ColumnGrid\n"
+        "print(' '.join(name for name in ('drawBotGrid.image', 'drawBotGrid.table', 'drawBotGrid.text', 'PIL') "
+        "if name in sys.modules))\n"
+    )
+    loaded = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert loaded.strip() == ""
+
+
+def test_public_names() -> None:
+    for name in drawBotGrid.__all__:
+        assert getattr(drawBotGrid, name) is not None
+    assert set(drawBotGrid.__all__) <= set(dir(drawBotGrid))
@@ -0,0 +1,76 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import drawBot as db
+
+import drawBotGrid
+from drawBotGrid import BaselineGrid, ColumnGrid, Table, baselineGridTextBox, columnTextBox, imageBox
+from drawBotGrid.instrumentation import instrumented
+
+
+def test_stats() -> None:
+    textSize = db.textSize
+    with db.drawing():
+        with drawBotGrid.stats() as stats:
+            db.newPage(1000, 1000)
+            ColumnGrid((50, 50, 900, 900), 4).draw()
+            columnTextBox("Lorem ipsum dolor sit amet " * 50, (50, 50, 900, 900), 3)
+            db.newPage(1000, 1000)
+            imageBox("drawBotGrid/docs/drawMech-small.jpg", (0, 0, 50, 50))
+            imageBox("drawBotGrid/docs/drawMech-small.jpg", (50, 0, 50, 50))
+        columnTextBox("Lorem ipsum", (50, 50, 900, 900))
+
+    assert db.textSize is textSize
+    assert stats.calls("column_textBox") == 1
+    assert stats.calls("AbstractArea.draw") == 1
+    assert stats.calls("image_box") == 2
+    assert stats.calls("drawBot.image") == 2
+    assert set(stats.pages) == {1, 2}
+    assert "column_textBox" in stats.pages[1]
+    assert "image_box" not in stats.pages[1]
+    assert "page 2" in stats.report(per_page=True)
+
+
+def test_stats_threads() -> None:
+    @instrumented
+    def layout() -> None:
+        pass
+
+    def layout_many() -> None:
+        for _ in range(1000):
+            layout()
+
+    with db.drawing():
+        db.newPage(1000, 1000)
+        # like image_box prefetching, the threads run in a copy of the collecting context
+        with drawBotGrid.stats() as stats, ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(copy_context().run, layout_many) for _ in range(8)]
+            for future in futures:
+                future.result()
+
+    assert stats.calls("test_stats_threads.<locals>.layout") == 8000
+
+
+def test_trace(tmp_path) -> None:
+    path = tmp_path / "trace.json"
+    with db.drawing():
+        db.newPage(1000, 1000)
+        with drawBotGrid.trace(path):
+            columnTextBox("Lorem ipsum dolor sit amet " * 50, (50, 50, 900, 900), 3)
+            baselineGridTextBox("Lorem ipsum", (50, 50, 900, 900), BaselineGrid((50, 50, 900, 900), 12))
+            Table((50, 900, 400, 800), [{"name": "item"}], [{"title": "name"}])
+            imageBox("drawBotGrid/docs/drawMech-small.jpg", (0, 0, 50, 50), fitting="crop", scale=0.3)
+        imageBox("drawBotGrid/docs/drawMech-small.jpg", (0, 0, 50, 50), fitting="crop", scale=0.2)
+
+    events = json.loads(path.read_text())["traceEvents"]
+    names = [event["name"] for event in events]
+    assert names.count("column_textBox.column") == 3
+    assert {
+        "baseline_grid_textBox.measure",
+        "baseline_grid_textBox.draw",
+        "Table.measure_rows",
+        "image_box.place",
+    } <= set(names)
+    assert names.count("image_box.place") == 1
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
@@ -0,0 +1,116 @@
+import drawBot as db
+import pytest
+
+from drawBotGrid.table import RowsManager, Table, paginateTable
+
+columns = [
+    {"title": "name", "label": "Name"},
+    {"title": "price", "label": "Price", "width": 60},
+]
+
+
+def price_list(rows: int):
+    for index in range(rows):
+        yield {"name": f"item {index}" + "\nnote" * (index % 3), "price": f"{index}.00"}
+
+
+def test_table_rows_origins() -> None:
+    with db.drawing():
+        db.newPage(1000, 1000)
+        table = Table((50, 900, 400, 800), list(price_list(5)), columns, header_gap=4)
+    rows_manager = table.rows_manager
+    assert all(height > 0 for height in rows_manager.heights)
+    assert rows_manager.origins[0] == pytest.approx(900 - rows_manager.heights[0])
+    assert rows_manager.origins[1] == pytest.approx(rows_manager.origins[0] - 4 - rows_manager.heights[1])
+    assert rows_manager.total_height == pytest.approx(sum(rows_manager.heights) + 4)
+
+
+@pytest.mark.parametrize("batch_size", [1, 32, 256])
+def test_paginateTable(batch_size: int, monkeypatch) -> None:
+    measured_batches = []
+    measure_rows_heights = RowsManager._measure_rows_heights
+    monkeypatch.setattr(
+        RowsManager,
+        "_measure_rows_heights",
+        lambda self, rows: measured_batches.append(len(rows)) or measure_rows_heights(self, rows),
+    )
+    with db.drawing():
+        db.newPage(1000, 1000)
+        tables = list(paginateTable((50, 900, 400, 200), price_list(100), columns, header_gap=4, batch_size=batch_size))
+        monkeypatch.undo()
+        expected = Table((50, 900, 400, 200), list(price_list(100)), columns, header_gap=4)
+
+    # the header of the template, then the items batch by batch
+    assert measured_batches[1:] == [min(batch_size, 100 - start) for start in range(0, 100, batch_size)]
+    assert len(tables) > 1
+    assert all(table.cell_values[0] == ["Name", "Price"] for table in tables)
+    assert all(table.rows_manager.total_height <= 200 for table in tables)
+    assert [
+        row for table in tables for row in table.rows_manager.content_values
+    ] == expected.rows_manager.content_values
+    assert [height for table in tables for height in table.rows_manager.heights[1:]] == pytest.approx(
+        expected.rows_manager.heights[1:]
+    )
+
+
+def test_table_geometry_cache() -> None:
+    with db.drawing():
+        db.newPage(1000, 1000)
+        table = Table((50, 900, 400, 800), list(price_list(5)), columns)
+        cell_rects = table.cell_rects
+        assert table.cell_rects is cell_rects
+        assert table.rows_manager.rects is table.rows_manager.rects
+
+        table.show_header = False
+        assert table.cell_rects is not cell_rects
+        assert len(table.cell_rects) == 5
+
+        table.column_descriptions = columns[:1]
+        assert all(len(row) == 1 for row in table.cell_rects)
+        assert table.columns_manager.rects == [(50, 900, 400, table.height)]
+
+        table.items = list(price_list(2))
+        assert len(table.cell_rects) == 2
+
+
+@pytest.mark.parametrize("show_header", [True, False])
+def test_table_row_updates(show_header: bool, monkeypatch) -> None:
+    items = list(price_list(6))
+    with db.drawing():
+        db.newPage(1000, 1000)
+        table = Table((50, 900, 400, 800), items[:4], columns, header_gap=4)
+        table.show_header = show_header
+
+        measured = []
+        calculate_row_height = RowsManager._calculate_row_height
+        monkeypatch.setattr(
+            RowsManager,
+            "_calculate_row_height",
+            lambda self, row: measured.append(row) or calculate_row_height(self, row),
+        )
+        table.append_row(items[4])
+        table.insert_row(0, items[5])
+        table.update_row(2, items[0])
+        table.delete_row(-2)
+        assert len(measured) == 3
+        monkeypatch.undo()
+
+        expected = Table((50, 900, 400, 800), [items[5], items[0], items[0], items[2], items[4]], columns, header_gap=4)
+        expected.show_header = show_header
+
+    assert table.cell_values == expected.cell_values
+    assert table.rows_manager.heights == pytest.approx(expected.rows_manager.heights)
+    assert table.rows_manager.origins == pytest.approx(expected.rows_manager.origins)
+    assert table.actual_height == pytest.approx(expected.actual_height)
+    assert [cell.rect for row in table.cell_rects for cell in row] == pytest.approx(
+        [cell.rect for row in expected.cell_rects for cell in row]
+    )
+
+
+def test_table_measurement_dedup() -> None:
+    items = [{"name": "item", "price": "EUR"} for _ in range(10)] + [{"name": "other", "price": ""}]
+    with db.drawing():
+        db.newPage(1000, 1000)
+        table = Table((50, 900, 400, 800), items, columns)
+    # header, then "item", "EUR", "other" and ""
+    assert table.rows_manager.measurement_info() == {"cells": 24, "measured": 6, "saved": 18}
@@ -1,5 +1,191 @@
-from drawBotGrid.text import correct_box_direction
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import drawBot as db
+import pytest
+
+from drawBotGrid import text
+from drawBotGrid.grid import BaselineGrid, ColumnGrid
+from drawBotGrid.text import (
+    MeasurementCache,
+    _flow_baseline_grid_columns,
+    _get_cached_line_height_from_desired_baseline_height,
+    _text_overflow_test_mode,
+    baseline_grid_textBox,
+    clear_metrics_cache,
+    correct_box_direction,
+    fit_column_text,
+    fit_text_to_box,
+    measurement_cache,
+    set_metric_baseline_height,
+    set_text_overflow_test_mode,
+)
 
 
 def test_correct_box_direction() -> None:
     assert (0, -100, 100, 100) == correct_box_direction((0, 0, 100, -100))
+
+
+def test_measurement_cache() -> None:
+    cache = MeasurementCache(maxsize=2)
+    calls = []
+
+    def measure(value):
+        calls.append(value)
+        return value * 2
+
+    assert cache.get("a", lambda: measure(1)) == 2
+    assert cache.get("a", lambda: measure(1)) == 2
+    assert cache.get("b", lambda: measure(2)) == 4
+    assert cache.get("c", lambda: measure(3)) == 6
+    # "a" was the least recently used entry
+    assert cache.get("a", lambda: measure(1)) == 2
+    assert calls == [1, 2, 3, 1]
+    assert cache.info() == {"hits": 1, "misses": 4, "size": 2, "maxsize": 2}
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+
+def test_measurement_cache_threads() -> None:
+    cache = MeasurementCache(maxsize=8)
+    barrier = threading.Barrier(8)
+
+    def measure_keys(offset: int) -> list[bool]:
+        barrier.wait()
+        keys = [(offset + index) % 16 for index in range(2000)]
+        return [cache.get(key, lambda key=key: key * 2) == key * 2 for key in keys]
+
+    # switch threads as often as possible, so the cache updates interleave
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(measure_keys, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert all(all(thread_results) for thread_results in results)
+    assert cache.hits + cache.misses == 8 * 2000
+    assert len(cache) == 8
+
+
+def test_metric_baseline_height_is_memoized(monkeypatch) -> None:
+    measured = []
+    text_box_baselines = db.textBoxBaselines
+    monkeypatch.setattr(
+        db, "textBoxBaselines", lambda *args, **kwargs: measured.append(args) or text_box_baselines(*args, **kwargs)
+    )
+    with db.drawing():
+        db.newPage(1000, 1000)
+        db.fontSize(10)
+        clear_metrics_cache()
+        line_height = set_metric_baseline_height(14)
+        assert set_metric_baseline_height(14) == line_height
+        assert _get_cached_line_height_from_desired_baseline_height.cache_info().hits == 1
+        assert len(measured) == 1
+        clear_metrics_cache()
+        assert _get_cached_line_height_from_desired_baseline_height.cache_info().currsize == 0
+        assert len(measurement_cache) == 0
+        assert set_metric_baseline_height(14) == line_height
+        # measured again, not read from another cache
+        assert len(measured) == 2
+
+
+def test_fit_text_to_box() -> None:
+    txt = "Lorem ipsum dolor sit amet. " * 40
+    box = (0, 0, 200, 200)
+    with db.drawing():
+        db.newPage(1000, 1000)
+        font_size, overflow = fit_text_to_box(txt, box, max_font_size=40, tolerance=0.1)
+        assert overflow == ""
+        assert 1 < font_size < 40
+        with db.savedState():
+            db.fontSize(font_size)
+            assert db.textOverflow(txt, box) == ""
+            db.fontSize(font_size + 0.2)
+            assert db.textOverflow(txt, box) != ""
+
+
+def test_fit_column_text() -> None:
+    txt = "Lorem ipsum dolor sit amet. " * 40
+    with db.drawing():
+        db.newPage(1000, 1000)
+        font_size, overflow = fit_column_text(txt, (0, 0, 400, 200), max_font_size=40, subdivisions=3)
+        assert overflow == ""
+        assert 1 < font_size < 40
+        font_size, overflow = fit_column_text(txt, (0, 0, 400, 200), max_font_size=80, min_font_size=60, subdivisions=3)
+        assert font_size == 60
+        assert overflow != ""
+
+
+def test_fit_text_line_height_with_baseline_grid() -> None:
+    baseline_grid = BaselineGrid((0, 0, 400, 200), 12)
+    with pytest.raises(ValueError):
+        fit_text_to_box("Lorem ipsum", (0, 0, 400, 200), 40, baseline_grid=baseline_grid, line_height_ratio=1.2)
+    with pytest.raises(ValueError):
+        fit_column_text("Lorem ipsum", (0, 0, 400, 200), 40, baseline_grid=baseline_grid, line_height_ratio=1.2)
+
+
+def test_text_overflow_test_mode_is_scoped() -> None:
+    seen_by_thread = []
+    with set_text_overflow_test_mode(True):
+        assert _text_overflow_test_mode.get() is True
+        thread = threading.Thread(target=lambda: seen_by_thread.append(_text_overflow_test_mode.get()))
+        thread.start()
+        thread.join()
+        with set_text_overflow_test_mode(False):
+            assert _text_overflow_test_mode.get() is False
+        assert _text_overflow_test_mode.get() is True
+    assert _text_overflow_test_mode.get() is False
+    assert seen_by_thread == [False]
+
+
+def _mixed_sizes_text() -> db.FormattedString:
+    txt = db.FormattedString()
+    txt.append("small text " * 40, fontSize=9)
+    # long enough for the second column to start within the large text
+    txt.append("large text " * 80, fontSize=24)
+    txt.append("small text " * 40, fontSize=9)
+    return txt
+
+
+@pytest.mark.parametrize(
+    "make_text",
+    [
+        pytest.param(lambda: "Lorem ipsum dolor sit amet. " * 80, id="str"),
+        pytest.param(_mixed_sizes_text, id="mixed_sizes"),
+    ],
+)
+def test_flow_baseline_grid_columns_matches_per_column(make_text, monkeypatch) -> None:
+    box = (50, 50, 900, 400)
+    baseline_grid = BaselineGrid((0, 0, 1000, 1000), 12)
+    textbox_funct = text._textbox_funct
+    drawn = []
+
+    def record_textbox(txt, box, align=None):
+        first_baseline = db.textBoxBaselines(txt, box, align=align)[0]
+        overflow = textbox_funct(txt, box, align=align)
+        drawn.append((first_baseline, str(overflow)))
+        return overflow
+
+    monkeypatch.setattr(text, "_textbox_funct", record_textbox)
+    with db.drawing():
+        db.newPage(1000, 1000)
+        columns = ColumnGrid(box, 3)
+        flow_overflow = _flow_baseline_grid_columns(make_text(), columns, baseline_grid)
+        flow_drawn, drawn = drawn, []
+
+        # the flow used to typeset each column with its own baseline_grid_textBox
+        overflow = make_text()
+        for col in columns:
+            if len(overflow) > 0:
+                overflow = baseline_grid_textBox(
+                    overflow, (col, columns.bottom, columns * 1, columns.height), baseline_grid
+                )
+
+    assert len(flow_drawn) > 1
+    assert str(flow_overflow) == str(overflow)
+    assert flow_drawn == drawn